@@ -0,0 +1,245 @@
+"""
+Canvas animation driven by a single frame scheduler.
+
+One root.after loop runs every registered animation once per frame. Each
+frame has a time budget: when it is used up, the remaining animations skip
+the frame (counted as dropped) so animation never starves the Tk event
+loop. Animations only touch the canvas items that change in a given frame
+and never create items while running.
+"""
+import time
+from collections import deque
+
+import numpy as np
+
+from logger import NiceLogger
+from settings import (
+    ANIMATION_FPS, ANIMATION_FRAME_BUDGET_MS, TWINKLE_FRACTION,
+    SNOW_MAX_FLAKES, SNOW_INITIAL_FLAKES, SNOW_TARGET_FRAME_MS
+)
+from tree_scene import ORNAMENT_COLORS
+
+# Initialize logger
+logger = NiceLogger(__name__).get_logger()
+
+# Number of recent frames kept for timing statistics
+FRAME_STATS_WINDOW = 120
+
+SNOW_COLOR = '#FFFFFF'
+SNOW_MIN_SPEED = 25  # Fall speed range in pixels per second
+SNOW_MAX_SPEED = 70
+SNOW_DRIFT = 12  # Horizontal sway amplitude in pixels per second
+
+
+class FrameScheduler:
+    """Central frame loop for all canvas animations."""
+
+    def __init__(self, root, fps=ANIMATION_FPS, budget_ms=ANIMATION_FRAME_BUDGET_MS):
+        self.root = root
+        self.interval_ms = max(1, round(1000 / fps))
+        self.budget = budget_ms / 1000
+        self.animations = []
+        self.frame_times = deque(maxlen=FRAME_STATS_WINDOW)
+        self.frames = 0
+        self.dropped = 0
+        self._job = None
+        self._last_frame = None
+        self._next_index = 0
+
+    @property
+    def running(self):
+        return self._job is not None
+
+    def add(self, animation):
+        """Register an animation and start the loop if needed."""
+        if animation not in self.animations:
+            self.animations.append(animation)
+        if not self.running:
+            self._last_frame = time.perf_counter()
+            self._job = self.root.after(self.interval_ms, self._tick)
+
+    def remove(self, animation):
+        """Unregister an animation; the loop stops when none are left."""
+        if animation in self.animations:
+            self.animations.remove(animation)
+        if not self.animations:
+            self.stop()
+
+    def stop(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+            logger.debug("Frame scheduler stopped", extra={'metadata': self.get_stats()})
+
+    def _tick(self):
+        started = time.perf_counter()
+        dt = started - self._last_frame
+        self._last_frame = started
+
+        # Rotate the starting animation so a busy frame doesn't always starve the same one
+        count = len(self.animations)
+        for offset in range(count):
+            animation = self.animations[(self._next_index + offset) % count]
+            if time.perf_counter() - started > self.budget:
+                self.dropped += count - offset
+                self._next_index = (self._next_index + offset) % count
+                break
+            try:
+                animation.step(dt)
+            except Exception as e:
+                logger.error("Animation step failed", extra={'metadata': {'error': str(e)}}, exc_info=True)
+                self.animations.remove(animation)
+                break
+
+        elapsed = time.perf_counter() - started
+        self.frame_times.append(elapsed)
+        self.frames += 1
+
+        if self.animations:
+            # Keep the frame rate, but always leave the event loop at least a millisecond
+            delay = max(1, self.interval_ms - round(elapsed * 1000))
+            self._job = self.root.after(delay, self._tick)
+        else:
+            self._job = None
+
+    def get_stats(self):
+        """Per-frame timing over the recent window, in milliseconds."""
+        if not self.frame_times:
+            return {'frames': self.frames, 'dropped': self.dropped}
+        times = sorted(self.frame_times)
+        return {
+            'frames': self.frames,
+            'dropped': self.dropped,
+            'mean_ms': round(sum(times) / len(times) * 1000, 3),
+            'p95_ms': round(times[min(len(times) - 1, int(len(times) * 0.95))] * 1000, 3),
+            'max_ms': round(times[-1] * 1000, 3),
+        }
+
+
+class TwinkleEffect:
+    """Ornaments twinkle by cycling colors; only the items changed in a frame are reconfigured."""
+
+    def __init__(self, drawer, fraction=TWINKLE_FRACTION, rng=None):
+        self.drawer = drawer
+        self.fraction = fraction
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def step(self, dt):
+        item_ids = self.drawer.item_ids('ornament')
+        if not item_ids:
+            return
+
+        changes = max(1, int(len(item_ids) * self.fraction))
+        picked = self.rng.choice(len(item_ids), size=min(changes, len(item_ids)), replace=False)
+        colors = self.rng.integers(len(ORNAMENT_COLORS), size=len(picked))
+
+        itemconfig = self.drawer.canvas.itemconfig
+        for index, color_index in zip(picked.tolist(), colors.tolist()):
+            itemconfig(item_ids[index], fill=ORNAMENT_COLORS[color_index])
+
+    def stop(self):
+        """Put the scene's own colors back."""
+        self.drawer.restore_fills('ornament')
+
+
+class SnowfallEffect:
+    """Snow over the canvas, simulated in preallocated NumPy buffers.
+
+    All flakes are updated in one vectorized step per frame and drawn
+    through a fixed pool of oval items that are only moved with coords().
+    The number of active flakes adapts to keep the step within its target
+    frame time; flakes beyond the active count are hidden, not deleted.
+    """
+
+    def __init__(self, drawer, max_flakes=SNOW_MAX_FLAKES, initial_flakes=SNOW_INITIAL_FLAKES,
+                 target_ms=SNOW_TARGET_FRAME_MS, rng=None):
+        self.drawer = drawer
+        self.max_flakes = max_flakes
+        self.active = min(initial_flakes, max_flakes)
+        self.target = target_ms / 1000
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        self.x = np.zeros(max_flakes)
+        self.y = np.zeros(max_flakes)
+        self.vy = np.zeros(max_flakes)
+        self.phase = np.zeros(max_flakes)
+        self.radius = np.zeros(max_flakes)
+        self.time = 0.0
+
+        self.item_ids = []
+        self._shown = 0
+        self._generation = None
+
+    def _respawn(self, indices, width, height, anywhere=False):
+        count = len(indices)
+        self.x[indices] = self.rng.random(count) * width
+        self.y[indices] = self.rng.random(count) * height if anywhere else -self.radius[indices]
+        self.vy[indices] = SNOW_MIN_SPEED + self.rng.random(count) * (SNOW_MAX_SPEED - SNOW_MIN_SPEED)
+        self.phase[indices] = self.rng.random(count) * (2 * np.pi)
+
+    def start(self):
+        """Create the item pool once and scatter the flakes over the canvas."""
+        canvas = self.drawer.canvas
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+
+        self.radius[:] = 1.0 + self.rng.random(self.max_flakes) * 2.0
+        self._respawn(np.arange(self.max_flakes), width, height, anywhere=True)
+
+        if not self.item_ids:
+            self.item_ids = [
+                canvas.create_oval(0, 0, 0, 0, fill=SNOW_COLOR, outline='', state='hidden', tags='snow')
+                for _ in range(self.max_flakes)
+            ]
+        self._shown = 0
+        self._generation = None
+
+    def step(self, dt):
+        started = time.perf_counter()
+        canvas = self.drawer.canvas
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        active = self.active
+        self.time += dt
+
+        # One vectorized update for every active flake
+        x = self.x[:active]
+        y = self.y[:active]
+        y += self.vy[:active] * dt
+        x += np.sin(self.phase[:active] + self.time) * SNOW_DRIFT * dt
+
+        fallen = np.flatnonzero(y - self.radius[:active] > height)
+        if len(fallen):
+            self._respawn(fallen, width, height)
+        np.mod(x, width, out=x)
+
+        r = self.radius[:active]
+        boxes = np.column_stack((x - r, y - r, x + r, y + r)).tolist()
+        coords = canvas.coords
+        for item_id, box in zip(self.item_ids, boxes):
+            coords(item_id, *box)
+
+        # Show or hide only the flakes whose visibility changed
+        if active > self._shown:
+            for item_id in self.item_ids[self._shown:active]:
+                canvas.itemconfig(item_id, state='normal')
+        elif active < self._shown:
+            for item_id in self.item_ids[active:self._shown]:
+                canvas.itemconfig(item_id, state='hidden')
+        self._shown = active
+
+        # Keep the snow above freshly created tree items
+        if self.drawer.generation != self._generation:
+            canvas.tag_raise('snow')
+            self._generation = self.drawer.generation
+
+        # Adapt the flake count towards the target frame time
+        elapsed = time.perf_counter() - started
+        if elapsed > self.target:
+            self.active = max(1, int(active * 0.9))
+        elif elapsed < self.target * 0.7:
+            self.active = min(self.max_flakes, int(active * 1.05) + 1)
+
+    def stop(self):
+        """Hide every flake; the pool is kept for the next start."""
+        for item_id in self.item_ids[:self._shown]:
+            self.drawer.canvas.itemconfig(item_id, state='hidden')
+        self._shown = 0
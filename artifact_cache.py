@@ -0,0 +1,196 @@
+"""
+Persistent cache of downloaded update artifacts.
+
+Verified installers are kept in `UPDATES_DIR/artifacts`, stored under
+their SHA-256 (so identical files are kept once) and indexed by release
+version and asset name in `index.json`. A later launch that finds the same
+version reuses the cached installer after re-hashing it locally, without
+any network traffic. Pruning drops artifacts of every version other than
+the latest release, partial downloads nobody resumed, and the least
+recently used files once the cache is over its size cap.
+"""
+import json
+import os
+import time
+import uuid
+
+from downloader import sha256_file
+from logger import NiceLogger
+from settings import UPDATES_DIR, UPDATE_CACHE_MAX_MB, UPDATE_PARTIAL_MAX_AGE_DAYS
+
+# Initialize logger
+logger = NiceLogger(__name__).get_logger()
+
+# Bump when the layout of the index changes
+ARTIFACT_INDEX_VERSION = 1
+PARTIAL_SUFFIXES = ('.part', '.part.json')
+
+
+class ArtifactCache:
+    """Verified update artifacts, deduplicated by content and indexed by (version, asset name)."""
+
+    def __init__(self, directory=UPDATES_DIR, max_bytes=UPDATE_CACHE_MAX_MB * 1024 * 1024,
+                 partial_max_age_seconds=UPDATE_PARTIAL_MAX_AGE_DAYS * 24 * 3600):
+        self.directory = directory
+        self.artifacts_dir = directory / 'artifacts'
+        self.index_path = self.artifacts_dir / 'index.json'
+        self.max_bytes = max_bytes
+        self.partial_max_age_seconds = partial_max_age_seconds
+
+    def staging_path(self, name):
+        """Where to download an asset (and keep its partial download) before adding it."""
+        return self.directory / name
+
+    def _blob_path(self, sha256, name):
+        # Keep the extension: Windows only runs installers named *.exe
+        return self.artifacts_dir / (sha256 + os.path.splitext(name)[1])
+
+    def _load_index(self):
+        try:
+            index = json.loads(self.index_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+        if index.get('version') != ARTIFACT_INDEX_VERSION:
+            return {}
+        return index.get('entries', {})
+
+    def _save_index(self, entries):
+        """Write the index atomically, so a crash never leaves a half-written index."""
+        self.artifacts_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.index_path.with_name(f"{self.index_path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            temp_path.write_text(json.dumps({'version': ARTIFACT_INDEX_VERSION, 'entries': entries}),
+                                 encoding='utf-8')
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            temp_path.unlink(missing_ok=True)
+            logger.warning("Failed to write artifact index", extra={'metadata': {'error': str(e)}})
+
+    @staticmethod
+    def _key(version, name):
+        return f"{version}/{name}"
+
+    def lookup(self, version, name):
+        """Path of the cached artifact for version and name, or None.
+
+        The file is re-hashed before it's handed out, so a corrupted or
+        tampered file is dropped instead of being installed.
+        """
+        entries = self._load_index()
+        entry = entries.get(self._key(version, name))
+        if entry is None:
+            return None
+
+        path = self._blob_path(entry['sha256'], name)
+        try:
+            valid = path.stat().st_size == entry['size'] and sha256_file(path).hexdigest() == entry['sha256']
+        except OSError:
+            valid = False
+        if not valid:
+            logger.warning("Cached artifact missing or corrupt, dropping it", extra={
+                'metadata': {'version': version, 'name': name, 'path': str(path)}
+            })
+            del entries[self._key(version, name)]
+            self._save_index(entries)
+            if not any(e['sha256'] == entry['sha256'] for e in entries.values()):
+                path.unlink(missing_ok=True)
+            return None
+
+        entry['used'] = time.time()
+        self._save_index(entries)
+        logger.info("Using cached artifact", extra={'metadata': {'version': version, 'name': name}})
+        return path
+
+    def add(self, version, name, path, sha256):
+        """Move a verified file into the cache and return its cached path."""
+        blob_path = self._blob_path(sha256, name)
+        self.artifacts_dir.mkdir(parents=True, exist_ok=True)
+        if blob_path.exists():
+            # Same content cached already, e.g. under another name
+            path.unlink()
+        else:
+            path.replace(blob_path)
+
+        entries = self._load_index()
+        now = time.time()
+        entries[self._key(version, name)] = {
+            'version': version, 'name': name, 'sha256': sha256, 'size': blob_path.stat().st_size,
+            'added': now, 'used': now
+        }
+        self._save_index(entries)
+        logger.debug("Artifact cached", extra={'metadata': {'version': version, 'name': name, 'sha256': sha256}})
+        self.prune(keep_version=version, protect=(blob_path,))
+        return blob_path
+
+    def prune(self, keep_version, protect=()):
+        """Drop artifacts of every version but keep_version, stale partial downloads and, over the size cap,
+        the least recently used files other than those in protect. Returns the number of bytes freed."""
+        entries = self._load_index()
+        entries = {key: entry for key, entry in entries.items() if entry['version'] == keep_version}
+        referenced = {self._blob_path(entry['sha256'], entry['name']).name for entry in entries.values()}
+        now = time.time()
+        freed = 0
+
+        # (last used, path) of everything that counts towards the cap
+        candidates = []
+        for directory in (self.directory, self.artifacts_dir):
+            try:
+                files = [path for path in directory.iterdir() if path.is_file() and path != self.index_path]
+            except OSError:
+                continue
+            for path in files:
+                stat = path.stat()
+                is_partial = path.name.endswith(PARTIAL_SUFFIXES)
+                if directory == self.artifacts_dir and path.name not in referenced and not path.name.endswith('.tmp'):
+                    stale = True
+                elif directory == self.directory:
+                    # Partial downloads may still be resumed; anything else left in staging was abandoned
+                    stale = not is_partial or now - stat.st_mtime > self.partial_max_age_seconds
+                else:
+                    stale = False
+
+                if stale:
+                    freed += self._remove(path, stat.st_size)
+                else:
+                    last_used = max((e['used'] for e in entries.values()
+                                     if self._blob_path(e['sha256'], e['name']) == path), default=stat.st_mtime)
+                    candidates.append((last_used, path, stat.st_size))
+
+        total = sum(size for _, _, size in candidates)
+        for _, path, size in sorted(candidates, key=lambda candidate: candidate[0]):
+            if total <= self.max_bytes:
+                break
+            if path in protect:
+                continue
+            total -= size
+            freed += self._remove(path, size)
+            entries = {key: entry for key, entry in entries.items()
+                       if self._blob_path(entry['sha256'], entry['name']) != path}
+
+        self._save_index(entries)
+        if freed:
+            logger.info("Pruned update artifacts", extra={
+                'metadata': {'freed_bytes': freed, 'kept_bytes': total, 'max_bytes': self.max_bytes}
+            })
+        return freed
+
+    @staticmethod
+    def _remove(path, size):
+        try:
+            path.unlink()
+            return size
+        except OSError as e:
+            # e.g. an installer that is still running
+            logger.debug("Could not remove artifact", extra={'metadata': {'path': str(path), 'error': str(e)}})
+            return 0
+
+
+_artifact_cache = None
+
+
+def get_artifact_cache():
+    """Process-wide artifact cache, created on first use."""
+    global _artifact_cache
+    if _artifact_cache is None:
+        _artifact_cache = ArtifactCache()
+    return _artifact_cache
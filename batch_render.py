@@ -0,0 +1,237 @@
+"""
+Headless batch renderer.
+
+Reads one JSON object of tree parameters per line (height, width, layers,
+color, ornaments, seed) from a file or stdin, renders every tree to an image
+across a process pool and streams one JSON result line per tree to stdout as
+soon as it finishes.
+
+With --sizes every tree is written once per size in EXPORT_SIZES (or the
+listed ones), as <name>-<size><suffix>, and the result line reports each
+size's file and render time.
+
+Usage:
+    python batch_render.py trees.jsonl --output-dir out
+    python batch_render.py trees.jsonl --sizes thumbnail,web
+    cat trees.jsonl | python batch_render.py - --format svg
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+from logger import NiceLogger
+from settings import DEFAULT_COLOR, DEFAULT_ORNAMENTS, EXPORT_SIZES
+
+# Initialize logger
+logger = NiceLogger(__name__).get_logger()
+
+REQUIRED_KEYS = ('height', 'width', 'layers')
+OUTPUT_FORMATS = ('png', 'jpg', 'svg')
+
+
+def parse_job(line):
+    """Parse one JSONL line into tree parameters, filling in defaults."""
+    params = json.loads(line)
+    if not isinstance(params, dict):
+        raise ValueError("Each line must be a JSON object")
+
+    missing = [key for key in REQUIRED_KEYS if key not in params]
+    if missing:
+        raise ValueError(f"Missing parameters: {', '.join(missing)}")
+
+    params.setdefault('color', DEFAULT_COLOR)
+    params.setdefault('ornaments', DEFAULT_ORNAMENTS)
+    return params
+
+
+def output_path_for(output_dir, name, index, output_format, used_names):
+    """Where to write a job's image.
+
+    Names must be plain file names, so no job can write outside
+    output_dir. A name used by an earlier job gets the job index appended
+    instead of overwriting that job's output.
+    """
+    if name is None:
+        name = f"tree_{index:05d}"
+    if not isinstance(name, str) or name in ('', '.', '..') or '/' in name or '\\' in name or Path(name).name != name:
+        raise ValueError(f"Invalid name {name!r}: must be a file name without a path")
+
+    # Case-insensitive, as on Windows and macOS file systems
+    if name.casefold() in used_names:
+        name = f"{name}_{index:05d}"
+    used_names.add(name.casefold())
+
+    output_path = output_dir / f"{name}.{output_format}"
+    if output_path.resolve().parent != output_dir.resolve():
+        raise ValueError(f"Invalid name {name!r}: must be a file name without a path")
+    return output_path
+
+
+def parse_sizes(value):
+    """Size names to export from a comma-separated list; 'all' selects every size in EXPORT_SIZES."""
+    if value == 'all':
+        return dict(EXPORT_SIZES)
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in EXPORT_SIZES]
+    if unknown or not names:
+        raise argparse.ArgumentTypeError(
+            f"Unknown size {', '.join(unknown) or value!r}; choose from {', '.join(EXPORT_SIZES)}"
+        )
+    return {name: EXPORT_SIZES[name] for name in names}
+
+
+def render_job(params, output_path, width=None, height=None, sizes=None, tile_workers=None):
+    """Render a single tree to output_path. Runs inside a worker process.
+
+    Returns the result fields to report: the render time and, with sizes,
+    the path, width and render time of every size.
+    """
+    # Imported here so the parent process never pays for Pillow/NumPy
+    from file_handler import write_tree_image, write_tree_poster, write_tree_sizes, write_tree_svg
+    from render_cache import get_render_cache, normalize_params
+    from settings import CANVAS_WIDTH, CANVAS_HEIGHT, POSTER_MIN_PIXELS
+    from tree_scene import build_tree_scene
+
+    started = time.perf_counter()
+    scene = get_render_cache().get_scene(normalize_params(params), CANVAS_WIDTH, CANVAS_HEIGHT, build_tree_scene)
+    if sizes:
+        results = write_tree_sizes(scene, output_path, sizes)
+        return {'seconds': round(time.perf_counter() - started, 4), 'sizes': results}
+    if str(output_path).endswith('.svg'):
+        write_tree_svg(scene, output_path)
+    elif str(output_path).endswith('.png') and width and (height or width) * width >= POSTER_MIN_PIXELS:
+        write_tree_poster(scene, output_path, width, height, workers=tile_workers)
+    else:
+        write_tree_image(scene, output_path, width, height)
+    return {'seconds': round(time.perf_counter() - started, 4)}
+
+
+def iter_jobs(stream):
+    """Yield (index, params, error) for every non-empty input line."""
+    index = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield index, parse_job(line), None
+        except (ValueError, json.JSONDecodeError) as e:
+            yield index, None, str(e)
+        index += 1
+
+
+def emit(result):
+    """Write one result line to stdout immediately."""
+    sys.stdout.write(json.dumps(result) + '\n')
+    sys.stdout.flush()
+
+
+def run_batch(stream, output_dir, output_format='png', workers=None, width=None, height=None, sizes=None,
+              tile_workers=None):
+    """Render every job from the stream, streaming results as they complete.
+
+    sizes ({name: width}) renders every tree once per size instead of at width x height.
+    tile_workers is the number of processes each poster-sized tree is tiled across; by
+    default the CPUs are shared out between the job workers.
+
+    Returns (succeeded, failed) counts.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    tile_workers = tile_workers or max(1, (os.cpu_count() or 1) // workers)
+
+    # Keep a bounded number of jobs in flight so huge inputs are read lazily
+    max_in_flight = workers * 4
+    succeeded = failed = 0
+    started = time.perf_counter()
+
+    logger.info("Starting batch render", extra={
+        'metadata': {'output_dir': str(output_dir), 'format': output_format, 'workers': workers,
+                     'tile_workers': tile_workers}
+    })
+
+    def finish(future):
+        nonlocal succeeded, failed
+        index, output_path = pending.pop(future)
+        try:
+            result = future.result()
+            succeeded += 1
+            emit({'index': index, 'ok': True, 'output': str(output_path), **result})
+        except Exception as e:
+            failed += 1
+            logger.error("Failed to render tree", extra={'metadata': {'index': index, 'error': str(e)}})
+            emit({'index': index, 'ok': False, 'output': str(output_path), 'error': str(e)})
+
+    used_names = set()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        for index, params, error in iter_jobs(stream):
+            if error:
+                failed += 1
+                emit({'index': index, 'ok': False, 'error': error})
+                continue
+
+            try:
+                output_path = output_path_for(output_dir, params.pop('name', None), index, output_format, used_names)
+            except ValueError as e:
+                failed += 1
+                emit({'index': index, 'ok': False, 'error': str(e)})
+                continue
+            future = executor.submit(render_job, params, output_path, width, height, sizes, tile_workers)
+            pending[future] = (index, output_path)
+
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(future)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                finish(future)
+
+    logger.info("Batch render finished", extra={
+        'metadata': {'succeeded': succeeded, 'failed': failed,
+                     'seconds': round(time.perf_counter() - started, 3)}
+    })
+    return succeeded, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render Christmas trees from JSONL parameter sets without a display.")
+    parser.add_argument('input', nargs='?', default='-', help="JSONL file with tree parameters, '-' for stdin")
+    parser.add_argument('-o', '--output-dir', default='renders', help="Directory for rendered images")
+    parser.add_argument('-f', '--format', choices=OUTPUT_FORMATS, default='png', help="Output format")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--width', type=int, default=None, help="Output width in pixels")
+    parser.add_argument('--height', type=int, default=None, help="Output height in pixels")
+    parser.add_argument('--tile-workers', type=int, default=None,
+                        help="Processes each poster-sized tree is rendered across (default: CPU count / workers)")
+    parser.add_argument('--sizes', nargs='?', const='all', type=parse_sizes, default=None,
+                        help=f"Write every tree in several sizes: a comma-separated list of {', '.join(EXPORT_SIZES)} "
+                             "(default: all of them)")
+    args = parser.parse_args(argv)
+    if args.sizes and args.format == 'svg':
+        parser.error("--sizes only applies to raster formats")
+    if args.sizes and (args.width or args.height):
+        parser.error("--sizes can't be combined with --width/--height")
+
+    batch_options = (
+        args.output_dir, args.format, args.workers, args.width, args.height, args.sizes, args.tile_workers
+    )
+    if args.input == '-':
+        succeeded, failed = run_batch(sys.stdin, *batch_options)
+    else:
+        with open(args.input, encoding='utf-8') as stream:
+            succeeded, failed = run_batch(stream, *batch_options)
+
+    print(f"Rendered {succeeded} trees, {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""
+Benchmark suite for drawing, export, startup and update checking.
+
+Every case is run a number of times after a warmup run and reported as
+mean/p50/p95 in milliseconds. Results are saved as JSON; given a baseline
+file from an earlier run, cases whose p50 got slower by more than the
+threshold are flagged and the runner exits with status 1.
+
+Usage:
+    python benchmark.py --output results.json
+    python benchmark.py --baseline baseline.json --threshold 0.2
+    python benchmark.py --suite draw --suite export --repeat 5
+
+The draw suite times TreeDrawer.draw_tree on a real canvas when a display
+is available (run under xvfb-run on CI) and falls back to building the
+scene headlessly otherwise; the case names say which path was measured.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from logger import NiceLogger
+from settings import PROJECT_VERSION, ROOT_DIR
+
+# Initialize logger
+logger = NiceLogger(__name__).get_logger()
+
+SUITES = ('draw', 'export', 'startup', 'update')
+
+# Timed runs per case in each suite, unless overridden with --repeat
+SUITE_RUNS = {'draw': 20, 'export': 5, 'startup': 5, 'update': 10}
+WARMUP_RUNS = 1
+
+DRAW_LAYERS = (3, 5, 8)
+DRAW_ORNAMENTS = (0, 5, 15)
+DEFAULT_THRESHOLD = 0.2  # Flag cases whose p50 is more than 20% slower than the baseline
+
+BENCH_PARAMS = {
+    'height': 300, 'width': 200, 'layers': 5, 'color': '#2E8B57', 'ornaments': 10, 'chains': 3, 'seed': None
+}
+
+
+def measure(func, runs, warmup=WARMUP_RUNS):
+    """Seconds taken by each of `runs` calls of func, after `warmup` untimed calls."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def summarize(samples):
+    """Mean, median and 95th percentile of the samples in milliseconds."""
+    times = sorted(samples)
+    count = len(times)
+    return {
+        'runs': count,
+        'mean_ms': round(sum(times) / count * 1000, 3),
+        'p50_ms': round(times[count // 2] * 1000, 3),
+        'p95_ms': round(times[min(count - 1, int(count * 0.95))] * 1000, 3),
+        'min_ms': round(times[0] * 1000, 3),
+        'max_ms': round(times[-1] * 1000, 3),
+    }
+
+
+def bench_draw(runs):
+    """draw_tree over a grid of layer and ornament counts."""
+    import tkinter as tk
+    from tree_scene import build_tree_scene
+
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        logger.warning("No display available, timing headless scene building instead of draw_tree")
+        root = None
+
+    try:
+        if root is not None:
+            from tree_drawer import TreeDrawer
+            drawer = TreeDrawer(root)
+            root.update()
+
+        for layers in DRAW_LAYERS:
+            for ornaments in DRAW_ORNAMENTS:
+                params = dict(BENCH_PARAMS, layers=layers, ornaments=ornaments)
+                if root is not None:
+                    def draw():
+                        drawer.draw_tree(params)
+                        root.update()
+                    name = f"draw_tree[layers={layers},ornaments={ornaments}]"
+                else:
+                    def draw():
+                        build_tree_scene(params)
+                    name = f"build_scene[layers={layers},ornaments={ornaments}]"
+                yield name, measure(draw, runs)
+    finally:
+        if root is not None:
+            root.destroy()
+
+
+def bench_export(runs):
+    """Offscreen raster and SVG export of one tree."""
+    from file_handler import write_tree_image, write_tree_svg
+    from tree_scene import build_tree_scene
+
+    scene = build_tree_scene(BENCH_PARAMS)
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        yield 'export_png', measure(lambda: write_tree_image(scene, directory / 'tree.png'), runs)
+        yield 'export_jpg', measure(lambda: write_tree_image(scene, directory / 'tree.jpg'), runs)
+        yield 'export_svg', measure(lambda: write_tree_svg(scene, directory / 'tree.svg'), runs)
+
+
+def bench_startup(runs):
+    """Importing the application in a fresh interpreter, with and without compiled bytecode."""
+    command = [sys.executable, '-c', 'import main']
+
+    def start(pycache_dir):
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=str(pycache_dir))
+        # Bytecode must be written for the warm runs to mean anything
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+        subprocess.run(command, cwd=ROOT_DIR, env=env, check=True, capture_output=True)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Cold: a new, empty bytecode cache for every run
+        def cold():
+            with tempfile.TemporaryDirectory(dir=directory) as pycache_dir:
+                start(pycache_dir)
+
+        yield 'startup_cold', measure(cold, runs, warmup=0)
+
+        # Warm: bytecode cached by the warmup run
+        warm_cache = Path(directory) / 'warm'
+        yield 'startup_warm', measure(lambda: start(warm_cache), runs)
+
+
+def bench_update(runs):
+    """check_for_updates against a local release server, with a throwaway release cache."""
+    from artifact_cache import ArtifactCache
+    from delta import delta_name, make_delta
+    from release_cache import ReleaseCache
+    from release_server import ReleaseServer
+    from update_checker import check_for_updates
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        conditional = ReleaseCache(directory / 'conditional.json', min_interval_seconds=0)
+        throttled = ReleaseCache(directory / 'throttled.json')
+        # Never touch the user's real installer cache
+        artifacts = ArtifactCache(directory / 'artifacts')
+
+        with ReleaseServer(latest_version=PROJECT_VERSION) as server:
+            # Warmup fills the caches; then every check is a 304 or no request at all
+            yield 'update_check_not_modified', measure(
+                lambda: check_for_updates(api_url=server.api_url, release_cache=conditional, artifact_cache=artifacts),
+                runs
+            )
+            yield 'update_check_throttled', measure(
+                lambda: check_for_updates(api_url=server.api_url, release_cache=throttled, artifact_cache=artifacts),
+                runs
+            )
+
+        def check_and_download(delta_source=None):
+            # Fresh caches every run, so every run downloads
+            shutil.rmtree(directory / 'updates', ignore_errors=True)
+            uncached = ReleaseCache(directory / 'uncached.json', min_interval_seconds=0)
+            uncached.path.unlink(missing_ok=True)
+            check_for_updates(api_url=server.api_url, release_cache=uncached, delta_source=delta_source,
+                              artifact_cache=ArtifactCache(directory / 'updates'))
+
+        installed = os.urandom(1024 * 1024)
+        installer = installed[:512 * 1024] + os.urandom(4096) + installed[512 * 1024:]
+        with ReleaseServer(latest_version='999.0.0', installer=installer) as server:
+            yield 'update_check_download', measure(check_and_download, runs)
+
+            # Installer already downloaded on an earlier launch: verified locally, nothing fetched
+            newer = ReleaseCache(directory / 'newer.json')
+            yield 'update_check_cached_installer', measure(
+                lambda: check_for_updates(api_url=server.api_url, release_cache=newer, artifact_cache=artifacts),
+                runs
+            )
+
+        # Same installer, rebuilt from a delta against the installed executable
+        installed_path = directory / 'installed.exe'
+        installed_path.write_bytes(installed)
+        deltas = {delta_name(PROJECT_VERSION, '999.0.0'): make_delta(installed, installer)}
+        with ReleaseServer(latest_version='999.0.0', installer=installer, extra_assets=deltas) as server:
+            yield 'update_check_delta', measure(lambda: check_and_download(installed_path), runs)
+
+
+SUITE_FUNCTIONS = {'draw': bench_draw, 'export': bench_export, 'startup': bench_startup, 'update': bench_update}
+
+
+def run_suites(suites=SUITES, repeat=None):
+    """Run the selected suites and return the results document."""
+    results = {
+        'meta': {
+            'version': PROJECT_VERSION,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'cases': {}
+    }
+
+    # Application logging would dominate the short cases; only warnings and above stay on
+    logging.disable(logging.INFO)
+    try:
+        for suite in suites:
+            for name, samples in SUITE_FUNCTIONS[suite](repeat or SUITE_RUNS[suite]):
+                results['cases'][name] = summarize(samples)
+                print(f"{name:45} {format_case(results['cases'][name])}", file=sys.stderr)
+    finally:
+        logging.disable(logging.NOTSET)
+    return results
+
+
+def format_case(case):
+    return f"mean {case['mean_ms']:9.3f} ms   p50 {case['p50_ms']:9.3f} ms   p95 {case['p95_ms']:9.3f} ms"
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Cases whose p50 exceeds the baseline's by more than threshold, as (name, baseline_ms, current_ms)."""
+    regressions = []
+    for name, case in results['cases'].items():
+        reference = baseline.get('cases', {}).get(name)
+        if reference and case['p50_ms'] > reference['p50_ms'] * (1 + threshold):
+            regressions.append((name, reference['p50_ms'], case['p50_ms']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark drawing, export, startup and update checking.")
+    parser.add_argument('-s', '--suite', action='append', choices=SUITES,
+                        help="Suite to run; repeat for several (default: all)")
+    parser.add_argument('-n', '--repeat', type=int, default=None, help="Timed runs per case")
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help="Where to save the results")
+    parser.add_argument('-b', '--baseline', default=None, help="Results file to compare against")
+    parser.add_argument('-t', '--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed p50 slowdown relative to the baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = run_suites(args.suite or SUITES, args.repeat)
+    Path(args.output).write_text(json.dumps(results, indent=2), encoding='utf-8')
+    print(f"Results saved to {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: p50 {before:.3f} ms -> {after:.3f} ms (+{(after / before - 1) * 100:.0f}%)",
+                  file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions above {args.threshold:.0%}", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,19 @@
+import argparse
+import hashlib
 import os
+import re
 import shutil
 import subprocess
+import sys
 from pathlib import Path
 
+from packaging import version
+
+from delta import delta_name, make_delta_file
 from logger import NiceLogger
 from settings import (
     PROJECT_NAME, PROJECT_VERSION, AUTHOR, DIST_DIR, TEMP_DIR, BUILD_DIR, MAIN_SCRIPT, ICON_PATH, ROOT_DIR, GITHUB_REPO,
-    ICON_PNG_PATH
+    ICON_PNG_PATH, RELEASES_ARCHIVE_DIR
 )
 
 # Initialize logger
@@ -136,8 +143,7 @@ DisableProgramGroupPage=yes
 LicenseFile=LICENSE
 OutputDir={DIST_DIR}
 OutputBaseFilename={PROJECT_NAME}-v{PROJECT_VERSION}_Setup
-Compression=lzma
-SolidCompression=yes
+Compression=none
 WizardStyle=modern
 PrivilegesRequired=lowest
 
@@ -289,13 +295,130 @@ def create_installer():
         return False
 
 
+def write_checksum(path):
+    """Write `<file>.sha256` next to a release artifact, in sha256sum format.
+
+    Upload it with the release; the updater verifies downloads against it.
+    """
+    try:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        checksum_path = path.with_name(path.name + '.sha256')
+        checksum_path.write_text(f"{digest.hexdigest()}  {path.name}\n", encoding='utf-8')
+        logger.info("Wrote checksum", extra={'metadata': {'path': str(checksum_path), 'sha256': digest.hexdigest()}})
+        return True
+    except Exception as e:
+        logger.error(
+            "Failed to write checksum",
+            extra={'metadata': {'error': str(e), 'path': str(path)}},
+            exc_info=True
+        )
+        return False
+
+
+def archive_release():
+    """Keep this build's executable in RELEASES_ARCHIVE_DIR, as the delta source for the next release."""
+    try:
+        archive_dir = RELEASES_ARCHIVE_DIR / PROJECT_VERSION
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(DIST_DIR / get_versioned_name(), archive_dir / get_versioned_name())
+        logger.info("Archived release executable", extra={'metadata': {'path': str(archive_dir)}})
+        return True
+    except Exception as e:
+        logger.error(
+            "Failed to archive release executable",
+            extra={'metadata': {'error': str(e)}},
+            exc_info=True
+        )
+        return False
+
+
+def find_previous_release():
+    """(version, executable path) of the newest archived release older than this one, or None."""
+    previous = []
+    if RELEASES_ARCHIVE_DIR.exists():
+        for archive_dir in RELEASES_ARCHIVE_DIR.iterdir():
+            try:
+                archived_version = version.parse(archive_dir.name)
+            except version.InvalidVersion:
+                continue
+            executable = archive_dir / f"{PROJECT_NAME}-v{archive_dir.name}.exe"
+            if archived_version < version.parse(PROJECT_VERSION) and executable.exists():
+                previous.append((archived_version, archive_dir.name, executable))
+    if not previous:
+        return None
+    _, previous_version, executable = max(previous)
+    return previous_version, executable
+
+
+def previous_release_from_path(executable, previous_version=None):
+    """(version, executable path) for an explicitly given previous executable.
+
+    The version is taken from the `<name>-v<version>.exe` file name unless given.
+    """
+    executable = Path(executable)
+    if not executable.is_file():
+        raise FileNotFoundError(f"Previous executable not found: {executable}")
+    if previous_version is None:
+        match = re.fullmatch(rf"{re.escape(PROJECT_NAME)}-v(.+)\.exe", executable.name)
+        if match is None:
+            raise ValueError(f"Can't tell the version of {executable.name}; pass --previous-version")
+        previous_version = match.group(1)
+    return previous_version, executable
+
+
+def create_delta(previous=None):
+    """Create the update delta from the previous release's executable to this installer.
+
+    The previous executable is what's installed on clients, so they can
+    rebuild the new installer from it and download only the delta. previous
+    is (version, executable path); by default the newest release archived
+    in RELEASES_ARCHIVE_DIR is used. Returns the delta path, or None when
+    there is no previous release or the delta failed.
+    """
+    try:
+        previous = previous or find_previous_release()
+        if previous is None:
+            logger.error("No previous release to create the update delta from", extra={
+                'metadata': {'archive': str(RELEASES_ARCHIVE_DIR)}
+            })
+            return None
+
+        previous_version, source_path = previous
+        installer_path = DIST_DIR / get_versioned_name(with_setup=True)
+        delta_path = DIST_DIR / delta_name(previous_version, PROJECT_VERSION)
+        logger.info("Creating update delta", extra={
+            'metadata': {'from_version': previous_version, 'to_version': PROJECT_VERSION}
+        })
+        delta_size = make_delta_file(source_path, installer_path, delta_path)
+        logger.info("Created update delta", extra={
+            'metadata': {'path': str(delta_path), 'size': delta_size, 'installer_size': installer_path.stat().st_size}
+        })
+        write_checksum(delta_path)
+        return delta_path
+    except Exception as e:
+        logger.error(
+            "Failed to create update delta",
+            extra={'metadata': {'error': str(e)}},
+            exc_info=True
+        )
+        return None
+
+
 def cleanup_dist():
     """Clean up the dist directory, keeping only the final exe files."""
     try:
         logger.info("Cleaning up dist directory")
         exe_name = get_versioned_name()
         setup_name = get_versioned_name(with_setup=True)
-        keep_files = {exe_name, setup_name}
+        keep_files = {exe_name, setup_name, setup_name + '.sha256'}
+        # Deltas from earlier releases to this one
+        keep_files.update(
+            name for name in os.listdir(DIST_DIR)
+            if name.startswith(f"{PROJECT_NAME}-v{PROJECT_VERSION}_from_v")
+        )
 
         for item in os.listdir(DIST_DIR):
             item_path = os.path.join(DIST_DIR, item)
@@ -329,16 +452,42 @@ def cleanup():
         )
 
 
-def main():
+def main(argv=None):
     """Main build process."""
+    parser = argparse.ArgumentParser(description=f"Build the {PROJECT_NAME} executable, installer and update delta.")
+    parser.add_argument('--previous-exe', default=None,
+                        help="Executable of the previous release to create the update delta from "
+                             f"(default: newest in {RELEASES_ARCHIVE_DIR.name}/)")
+    parser.add_argument('--previous-version', default=None,
+                        help="Version of --previous-exe, when its file name doesn't say")
+    parser.add_argument('--no-delta', action='store_true',
+                        help="Build without an update delta, e.g. for the first release")
+    args = parser.parse_args(argv)
+
+    previous = None
+    if args.previous_exe and not args.no_delta:
+        try:
+            previous = previous_release_from_path(args.previous_exe, args.previous_version)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+
     logger.info(f"Starting build process for {PROJECT_NAME} v{PROJECT_VERSION}")
 
     ensure_directories()
 
+    succeeded = False
     if build_executable():
         logger.info("Successfully built executable")
         if create_installer():
             logger.info("Successfully created installer")
+            write_checksum(DIST_DIR / get_versioned_name(with_setup=True))
+            # A release without its delta makes every client download the full installer
+            if args.no_delta or create_delta(previous) is not None:
+                succeeded = True
+            else:
+                print("No update delta was created. Pass the previous release's executable with --previous-exe, "
+                      "or build with --no-delta for a first release.", file=sys.stderr)
+            archive_release()
         else:
             logger.error("Failed to create installer")
     else:
@@ -347,8 +496,12 @@ def main():
     # Clean up dist directory before cleaning temp files
     cleanup_dist()
     cleanup()
+    if not succeeded:
+        logger.error("Build failed")
+        return 1
     logger.info("Build process completed")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+Binary delta patches between release artifacts.
+
+A delta rebuilds a target file from a source file the client already has,
+as a sequence of "copy this range of the source" and "insert these bytes"
+operations found by block matching: every aligned block of the source is
+indexed, and the target is scanned byte by byte for blocks that occur in
+the source, extending each match as far as it goes in both directions.
+Matches are found at any offset, so content that only moved (as it does
+when a module in the middle of a PyInstaller archive grows) is still
+copied. The operation stream is zlib-compressed.
+
+The header records the size and SHA-256 of both files: a delta is only
+applied to the exact source it was made from, and the rebuilt file is
+verified before it's used.
+"""
+import hashlib
+import struct
+import zlib
+
+from logger import NiceLogger
+from settings import PROJECT_NAME, DELTA_BLOCK_SIZE
+
+# Initialize logger
+logger = NiceLogger(__name__).get_logger()
+
+DELTA_MAGIC = b'TCTDELTA'
+DELTA_FORMAT_VERSION = 1
+DELTA_SUFFIX = '.delta'
+
+# Magic, format version, source size, target size, source SHA-256, target SHA-256
+HEADER = struct.Struct('>8sBQQ32s32s')
+COPY = b'C'
+INSERT = b'I'
+COPY_OP = struct.Struct('>QQ')  # Source offset, length
+INSERT_OP = struct.Struct('>Q')  # Length, followed by the bytes
+
+COMPARE_STEP = 4096
+IO_BLOCK_SIZE = 1024 * 1024
+
+
+class DeltaError(Exception):
+    """A delta is malformed, doesn't fit the source file, or rebuilt the wrong file."""
+
+
+def delta_name(from_version, to_version):
+    """Asset name of the delta from one release to the next."""
+    return f"{PROJECT_NAME}-v{to_version}_from_v{from_version}{DELTA_SUFFIX}"
+
+
+def _match_length(source, source_pos, target, target_pos):
+    """Length of the common prefix of source[source_pos:] and target[target_pos:]."""
+    length = 0
+    step = COMPARE_STEP
+    # Compare whole slices (fast, in C) and halve the step at the first difference
+    while step:
+        a = source[source_pos + length:source_pos + length + step]
+        if len(a) == step and a == target[target_pos + length:target_pos + length + step]:
+            length += step
+        else:
+            step //= 2
+    return length
+
+
+def make_delta(source, target, block_size=DELTA_BLOCK_SIZE):
+    """Delta that rebuilds target (bytes) from source (bytes)."""
+    index = {}
+    for offset in range(0, len(source) - block_size + 1, block_size):
+        index.setdefault(source[offset:offset + block_size], offset)
+
+    ops = []
+    copied = 0
+    literal_start = 0
+    position = 0
+    last_start = len(target) - block_size
+    while position <= last_start:
+        offset = index.get(target[position:position + block_size])
+        if offset is None:
+            position += 1
+            continue
+
+        # Grow the match backwards into the pending literal, then forwards
+        back = 0
+        while (back < position - literal_start and back < offset
+               and source[offset - back - 1] == target[position - back - 1]):
+            back += 1
+        length = back + block_size + _match_length(source, offset + block_size, target, position + block_size)
+
+        start = position - back
+        if start > literal_start:
+            ops.append(INSERT + INSERT_OP.pack(start - literal_start) + target[literal_start:start])
+        ops.append(COPY + COPY_OP.pack(offset - back, length))
+        copied += length
+        position = literal_start = start + length
+
+    if literal_start < len(target):
+        ops.append(INSERT + INSERT_OP.pack(len(target) - literal_start) + target[literal_start:])
+
+    header = HEADER.pack(
+        DELTA_MAGIC, DELTA_FORMAT_VERSION, len(source), len(target),
+        hashlib.sha256(source).digest(), hashlib.sha256(target).digest()
+    )
+    delta = header + zlib.compress(b''.join(ops), 9)
+    logger.debug("Delta created", extra={'metadata': {
+        'source_size': len(source), 'target_size': len(target), 'copied': copied, 'delta_size': len(delta)
+    }})
+    return delta
+
+
+def make_delta_file(source_path, target_path, delta_path, block_size=DELTA_BLOCK_SIZE):
+    """Write the delta from source_path to target_path into delta_path; returns its size."""
+    delta = make_delta(source_path.read_bytes(), target_path.read_bytes(), block_size)
+    delta_path.write_bytes(delta)
+    return len(delta)
+
+
+def read_header(delta):
+    """(source_size, target_size, source_sha256, target_sha256) of a delta, as hex digests."""
+    if len(delta) < HEADER.size:
+        raise DeltaError("Delta is truncated")
+    magic, format_version, source_size, target_size, source_sha256, target_sha256 = HEADER.unpack_from(delta)
+    if magic != DELTA_MAGIC or format_version != DELTA_FORMAT_VERSION:
+        raise DeltaError("Not a delta of a supported format")
+    return source_size, target_size, source_sha256.hex(), target_sha256.hex()
+
+
+def apply_delta(source_path, delta_path, target_path, expected_sha256=None):
+    """Rebuild target_path from source_path and the delta at delta_path.
+
+    Raises DeltaError when the source isn't the file the delta was made
+    from, or the result doesn't match the delta's (and expected_sha256's)
+    hash; target_path is then left untouched.
+    """
+    delta = delta_path.read_bytes()
+    source_size, target_size, source_sha256, target_sha256 = read_header(delta)
+    if expected_sha256 and expected_sha256.lower() != target_sha256:
+        raise DeltaError("Delta rebuilds a different file than the one published")
+
+    try:
+        ops = zlib.decompress(delta[HEADER.size:])
+    except zlib.error as e:
+        raise DeltaError(f"Delta is corrupt: {e}") from e
+
+    part_path = target_path.with_name(target_path.name + '.part')
+    try:
+        with open(source_path, 'rb') as source:
+            source_digest = hashlib.sha256()
+            for block in iter(lambda: source.read(IO_BLOCK_SIZE), b''):
+                source_digest.update(block)
+            if source.tell() != source_size or source_digest.hexdigest() != source_sha256:
+                raise DeltaError("Delta was made from a different source file")
+
+            digest = hashlib.sha256()
+            written = 0
+            position = 0
+            with open(part_path, 'wb') as target:
+                while position < len(ops):
+                    kind = ops[position:position + 1]
+                    position += 1
+                    if kind == COPY:
+                        offset, length = COPY_OP.unpack_from(ops, position)
+                        position += COPY_OP.size
+                        source.seek(offset)
+                        while length:
+                            block = source.read(min(length, IO_BLOCK_SIZE))
+                            if not block:
+                                raise DeltaError("Delta copies past the end of the source")
+                            target.write(block)
+                            digest.update(block)
+                            written += len(block)
+                            length -= len(block)
+                    elif kind == INSERT:
+                        (length,) = INSERT_OP.unpack_from(ops, position)
+                        position += INSERT_OP.size
+                        block = ops[position:position + length]
+                        position += length
+                        target.write(block)
+                        digest.update(block)
+                        written += len(block)
+                    else:
+                        raise DeltaError("Delta is corrupt: unknown operation")
+        if written != target_size or digest.hexdigest() != target_sha256:
+            raise DeltaError("Rebuilt file failed verification")
+    except struct.error as e:
+        part_path.unlink(missing_ok=True)
+        raise DeltaError(f"Delta is corrupt: {e}") from e
+    except (DeltaError, OSError):
+        part_path.unlink(missing_ok=True)
+        raise
+
+    part_path.replace(target_path)
+    return target_path
@@ -0,0 +1,220 @@
+"""
+Resumable, verified downloads over a pooled HTTP session.
+
+Data is streamed into `<name>.part` next to the destination, with the
+response validators saved in `<name>.part.json`. An interrupted download
+(dropped connection, timeout, cancellation, app closed) resumes from the
+partial file with a Range request guarded by If-Range, so a file that
+changed on the server starts over instead of being spliced. The SHA-256 is
+computed while streaming; only the already downloaded prefix is re-read
+when resuming. Chunk sizes adapt to the connection speed.
+"""
+import hashlib
+import json
+import time
+
+import requests
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+
+from logger import NiceLogger
+from settings import (
+    DOWNLOAD_MIN_CHUNK, DOWNLOAD_MAX_CHUNK, DOWNLOAD_CHUNK_SECONDS, DOWNLOAD_RETRIES, DOWNLOAD_PROGRESS_INTERVAL
+)
+
+# Initialize logger
+logger = NiceLogger(__name__).get_logger()
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Failures worth resuming after
+RETRYABLE_ERRORS = (
+    requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError, ProtocolError,
+    ReadTimeoutError
+)
+
+
+class DownloadCancelled(Exception):
+    """The download was stopped through its cancel event; the partial file is kept for resuming."""
+
+
+class ChecksumMismatch(Exception):
+    """The downloaded file does not match its published SHA-256."""
+
+
+class IncompleteDownload(requests.ConnectionError):
+    """The connection ended before Content-Length bytes arrived."""
+
+
+_session = None
+
+
+def get_session():
+    """Process-wide HTTP session, so connections are pooled and reused between requests."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        _session.mount('https://', adapter)
+        _session.mount('http://', adapter)
+    return _session
+
+
+def sha256_file(path):
+    """SHA-256 hash object of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest
+
+
+class AdaptiveChunkSize:
+    """Grows the read size on fast connections and shrinks it on slow ones, aiming at a fixed time per read."""
+
+    def __init__(self, minimum=DOWNLOAD_MIN_CHUNK, maximum=DOWNLOAD_MAX_CHUNK, target_seconds=DOWNLOAD_CHUNK_SECONDS):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target = target_seconds
+        self.size = minimum
+
+    def update(self, received, elapsed):
+        if received >= self.size and elapsed < self.target / 2:
+            self.size = min(self.maximum, self.size * 2)
+        elif elapsed > self.target * 2:
+            self.size = max(self.minimum, self.size // 2)
+        return self.size
+
+
+def _part_paths(destination):
+    return (
+        destination.with_name(destination.name + '.part'),
+        destination.with_name(destination.name + '.part.json')
+    )
+
+
+def _discard_partial(destination):
+    for path in _part_paths(destination):
+        path.unlink(missing_ok=True)
+
+
+def _load_partial(destination, url):
+    """Bytes already downloaded from url and their validators, or (0, {}) when there is nothing to resume."""
+    part_path, meta_path = _part_paths(destination)
+    try:
+        meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        size = part_path.stat().st_size
+    except (OSError, ValueError):
+        _discard_partial(destination)
+        return 0, {}
+
+    if meta.get('url') != url or not (meta.get('etag') or meta.get('last_modified')):
+        # Without a validator the server can't tell us whether the file changed
+        _discard_partial(destination)
+        return 0, {}
+    return size, meta
+
+
+def _download_once(session, url, destination, cancel_event, progress, timeout):
+    part_path, meta_path = _part_paths(destination)
+    offset, meta = _load_partial(destination, url)
+
+    headers = {}
+    if offset:
+        headers['Range'] = f"bytes={offset}-"
+        headers['If-Range'] = meta.get('etag') or meta['last_modified']
+
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 416:
+            # The partial file doesn't fit the current file at all
+            logger.warning("Partial download rejected by server, starting over", extra={'metadata': {'url': url}})
+            _discard_partial(destination)
+            return _download_once(session, url, destination, cancel_event, progress, timeout)
+        response.raise_for_status()
+
+        if offset and response.status_code != 206:
+            logger.info("Server sent the whole file, restarting download", extra={'metadata': {'url': url}})
+            offset = 0
+
+        digest = sha256_file(part_path) if offset else hashlib.sha256()
+        length = response.headers.get('Content-Length')
+        total = offset + int(length) if length is not None else None
+
+        meta_path.write_text(json.dumps({
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'total': total,
+        }), encoding='utf-8')
+
+        if offset:
+            logger.info("Resuming download", extra={'metadata': {'url': url, 'offset': offset, 'total': total}})
+
+        done = offset
+        chunks = AdaptiveChunkSize()
+        last_report = 0.0
+        with open(part_path, 'ab' if offset else 'wb') as part_file:
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise DownloadCancelled()
+
+                started = time.perf_counter()
+                chunk = response.raw.read(chunks.size, decode_content=True)
+                if not chunk:
+                    break
+                part_file.write(chunk)
+                digest.update(chunk)
+                done += len(chunk)
+                chunks.update(len(chunk), time.perf_counter() - started)
+
+                if progress is not None and started - last_report >= DOWNLOAD_PROGRESS_INTERVAL:
+                    progress(done, total)
+                    last_report = started
+
+    if total is not None and done < total:
+        raise IncompleteDownload(f"Connection closed after {done} of {total} bytes")
+    if progress is not None:
+        progress(done, total)
+    return digest
+
+
+def download_file(url, destination, expected_sha256=None, cancel_event=None, progress=None, timeout=None,
+                  retries=DOWNLOAD_RETRIES, session=None):
+    """Download url to destination, resuming any earlier partial download.
+
+    Dropped connections and timeouts are retried up to `retries` times,
+    each time resuming where the previous attempt stopped. The file only
+    appears at destination once complete and, when expected_sha256 is
+    given, verified. progress(done_bytes, total_bytes_or_None) is called
+    from the downloading thread.
+    """
+    session = session or get_session()
+    destination.parent.mkdir(parents=True, exist_ok=True)
+
+    for attempt in range(retries + 1):
+        try:
+            digest = _download_once(session, url, destination, cancel_event, progress, timeout)
+            break
+        except RETRYABLE_ERRORS as e:
+            if attempt == retries:
+                raise
+            delay = min(2 ** attempt, 8)
+            logger.warning("Download interrupted, resuming", extra={
+                'metadata': {'url': url, 'error': str(e), 'attempt': attempt + 1, 'delay_s': delay}
+            })
+            if cancel_event is not None and cancel_event.wait(delay):
+                raise DownloadCancelled()
+            if cancel_event is None:
+                time.sleep(delay)
+
+    part_path, meta_path = _part_paths(destination)
+    actual = digest.hexdigest()
+    if expected_sha256 and actual != expected_sha256.lower():
+        _discard_partial(destination)
+        raise ChecksumMismatch(f"Expected SHA-256 {expected_sha256}, got {actual}")
+
+    part_path.replace(destination)
+    meta_path.unlink(missing_ok=True)
+    logger.info("Download complete", extra={
+        'metadata': {'path': str(destination), 'sha256': actual, 'verified': bool(expected_sha256)}
+    })
+    return destination
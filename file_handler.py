@@ -1,26 +1,158 @@
-from tkinter import filedialog
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import tkinter as tk
+from tkinter import filedialog, simpledialog
 
-from PIL import ImageGrab
+from PIL import Image
 
+from logger import NiceLogger
+from gif_export import write_scene_gif
+from poster_export import write_scene_poster
+from raster_renderer import render_scene_image
+from render_cache import get_render_cache
+from settings import (
+    EXPORT_SCALE, EXPORT_DPI, EXPORT_SUPERSAMPLE, EXPORT_SIZES, GIF_FRAMES, GIF_FPS, POSTER_DEFAULT_WIDTH,
+    POSTER_MAX_WIDTH
+)
+from svg_export import write_scene_svg
+from translations import TRANSLATIONS
 
-def save_canvas_as_image(canvas):
-    # Get canvas position and dimensions
-    x = canvas.winfo_rootx()
-    y = canvas.winfo_rooty()
-    width = canvas.winfo_width()
-    height = canvas.winfo_height()
+# Initialize logger
+logger = NiceLogger(__name__).get_logger()
 
+
+def write_tree_image(scene, file_path, width=None, height=None, dpi=EXPORT_DPI, supersample=EXPORT_SUPERSAMPLE):
+    """Render a tree scene offscreen and save it; works without a display."""
+    if width is None and height is None:
+        width = scene.width * EXPORT_SCALE
+        height = scene.height * EXPORT_SCALE
+
+    image_format = Image.registered_extensions().get(Path(file_path).suffix.lower(), 'PNG')
+
+    def encode():
+        logger.debug("Rendering tree image", extra={
+            'metadata': {'path': str(file_path), 'width': width, 'height': height, 'dpi': dpi}
+        })
+        buffer = io.BytesIO()
+        render_scene_image(scene, width, height, supersample).save(buffer, image_format, dpi=(dpi, dpi))
+        return buffer.getvalue()
+
+    options = (image_format, scene.width, scene.height, width, height, dpi, supersample)
+    Path(file_path).write_bytes(get_render_cache().get_image(scene, options, encode))
+    return file_path
+
+
+def write_tree_poster(scene, file_path, width, height=None, dpi=EXPORT_DPI, supersample=EXPORT_SUPERSAMPLE,
+                      workers=None):
+    """Render a poster-sized PNG tile by tile in parallel workers, with memory bounded by the tile size."""
+    if height is None:
+        height = round(scene.height * width / scene.width)
+
+    logger.info("Rendering tree poster", extra={
+        'metadata': {'path': str(file_path), 'width': width, 'height': height, 'dpi': dpi}
+    })
+    with open(file_path, 'wb') as poster_file:
+        write_scene_poster(scene, poster_file, width, height, dpi, supersample, workers=workers)
+    return file_path
+
+
+def write_tree_sizes(scene, file_path, sizes=None, dpi=EXPORT_DPI, supersample=EXPORT_SUPERSAMPLE, workers=None):
+    """Export one scene at several widths concurrently, one file per size.
+
+    The scene geometry is computed once by the caller; every size is then
+    rasterized and encoded on its own thread, which overlaps well because
+    Pillow releases the GIL while resampling and encoding. Files are named
+    <stem>-<size name><suffix> next to file_path. Returns the output path and
+    render time in seconds for each size name.
+    """
+    sizes = sizes or EXPORT_SIZES
+    file_path = Path(file_path)
+    get_render_cache()  # Create the shared cache before the threads race for it
+
+    def export(name, width):
+        started = time.perf_counter()
+        output_path = file_path.with_name(f"{file_path.stem}-{name}{file_path.suffix}")
+        write_tree_image(scene, output_path, width, None, dpi, supersample)
+        return {'path': str(output_path), 'width': width, 'seconds': round(time.perf_counter() - started, 4)}
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers or len(sizes)) as executor:
+        futures = {name: executor.submit(export, name, width) for name, width in sizes.items()}
+        results = {name: future.result() for name, future in futures.items()}
+
+    logger.info("Exported tree in several sizes", extra={
+        'metadata': {'sizes': len(results), 'seconds': round(time.perf_counter() - started, 4)}
+    })
+    return results
+
+
+def write_tree_svg(scene, file_path):
+    """Stream a tree scene to an SVG file, element by element."""
+    logger.debug("Writing tree SVG", extra={'metadata': {'path': str(file_path), 'items': len(scene)}})
+    with open(file_path, 'w', encoding='utf-8', newline='\n') as svg_file:
+        write_scene_svg(scene, svg_file)
+    return file_path
+
+
+def write_tree_gif(scene, file_path, frames=GIF_FRAMES, fps=GIF_FPS, width=None, height=None,
+                   supersample=EXPORT_SUPERSAMPLE):
+    """Export a looping GIF with cycling ornament colors, encoding one frame at a time."""
+    if width is None and height is None:
+        width = scene.width * EXPORT_SCALE
+        height = scene.height * EXPORT_SCALE
+    elif width is None:
+        width = round(scene.width * height / scene.height)
+    elif height is None:
+        height = round(scene.height * width / scene.width)
+
+    logger.debug("Writing animated tree GIF", extra={
+        'metadata': {'path': str(file_path), 'frames': frames, 'fps': fps, 'width': width, 'height': height}
+    })
+    with open(file_path, 'wb') as gif_file:
+        write_scene_gif(scene, gif_file, frames, round(1000 / fps), width, height, supersample)
+    return file_path
+
+
+POSTER_FILE_TYPE = "PNG poster"
+
+
+def save_tree_as_image(scene, lang='en'):
+    """Ask for a location and export the tree scene as an image.
+
+    Choosing the poster file type asks for a width and renders a large PNG
+    tile by tile across worker processes.
+    """
     # Choose save location
+    file_type = tk.StringVar()
     file_path = filedialog.asksaveasfilename(
         defaultextension=".png",
         filetypes=[
             ("PNG files", "*.png"),
             ("JPEG files", "*.jpg"),
+            ("SVG files", "*.svg"),
+            ("Animated GIF", "*.gif"),
+            (POSTER_FILE_TYPE, "*.png"),
             ("All files", "*.*")
-        ]
+        ],
+        typevariable=file_type
     )
 
     if file_path:
-        # Capture canvas area screenshot
-        screenshot = ImageGrab.grab(bbox=(x, y, x + width, y + height))
-        screenshot.save(file_path)
+        if file_type.get() == POSTER_FILE_TYPE and file_path.lower().endswith('.png'):
+            width = simpledialog.askinteger(
+                TRANSLATIONS[lang]['poster_title'],
+                TRANSLATIONS[lang]['poster_width'],
+                initialvalue=POSTER_DEFAULT_WIDTH, minvalue=scene.width, maxvalue=POSTER_MAX_WIDTH
+            )
+            if width is None:
+                return None
+            write_tree_poster(scene, file_path, width)
+        elif file_path.lower().endswith('.svg'):
+            write_tree_svg(scene, file_path)
+        elif file_path.lower().endswith('.gif'):
+            write_tree_gif(scene, file_path)
+        else:
+            write_tree_image(scene, file_path)
+    return file_path
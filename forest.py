@@ -0,0 +1,267 @@
+"""
+Forest mode: hundreds or thousands of trees on one scrollable canvas.
+
+Tree layouts are cheap parameter sets placed on a jittered grid and indexed
+by bounding box in a uniform grid spatial index. Only trees intersecting the
+visible viewport (plus a margin) exist as canvas items; the rest are created
+or deleted lazily as the view scrolls, which keeps the Tk item count small
+no matter how big the forest is.
+"""
+import math
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import ttk
+
+from logger import NiceLogger
+from settings import (
+    MIN_HEIGHT, MAX_HEIGHT, MIN_WIDTH, MAX_WIDTH, MIN_LAYERS, MAX_LAYERS, MAX_ORNAMENTS, MAX_CHAINS,
+    CANVAS_BACKGROUND, LIVE_PREVIEW_INTERVAL_MS,
+    FOREST_TREE_COUNT, FOREST_CELL_SIZE, FOREST_VIEW_MARGIN, FOREST_SCENE_CACHE_SIZE, FOREST_WINDOW_SIZE
+)
+from translations import TRANSLATIONS
+from tree_scene import TRUNK_HEIGHT, ORNAMENT_SIZE, ORNAMENT_CAP_HEIGHT, build_tree_scene, make_rng
+
+# Initialize logger
+logger = NiceLogger(__name__).get_logger()
+
+FOREST_COLORS = ('#2E8B57', '#228B22', '#006400', '#3CB371', '#556B2F', '#2F4F4F')
+
+# Every tree is laid out in a slot large enough for the biggest allowed tree
+SLOT_PADDING = ORNAMENT_SIZE + ORNAMENT_CAP_HEIGHT
+SLOT_WIDTH = MAX_WIDTH + 2 * SLOT_PADDING
+SLOT_HEIGHT = MAX_HEIGHT + 100 + SLOT_PADDING  # build_tree_scene keeps the base 100px above the bottom
+
+
+class ForestTree:
+    """One tree of the forest: its parameters, slot origin and bounding box in forest coordinates."""
+    __slots__ = ('params', 'x', 'y', 'bbox')
+
+    def __init__(self, params, x, y):
+        self.params = params
+        self.x = x
+        self.y = y
+
+        # Matches the geometry of build_tree_scene for a SLOT_WIDTH x SLOT_HEIGHT canvas
+        center_x = x + SLOT_WIDTH // 2
+        base_y = y + SLOT_HEIGHT - 100
+        half_width = params['width'] / 2 + SLOT_PADDING
+        self.bbox = (
+            center_x - half_width,
+            base_y - params['height'] + TRUNK_HEIGHT - SLOT_PADDING,
+            center_x + half_width,
+            base_y + TRUNK_HEIGHT
+        )
+
+
+class SpatialGrid:
+    """Uniform grid spatial index over axis-aligned bounding boxes."""
+
+    def __init__(self, cell_size=FOREST_CELL_SIZE):
+        self.cell_size = cell_size
+        self._cells = {}
+        self._boxes = {}
+
+    def _cell_range(self, bbox):
+        x1, y1, x2, y2 = bbox
+        size = self.cell_size
+        return (
+            range(math.floor(x1 / size), math.floor(x2 / size) + 1),
+            range(math.floor(y1 / size), math.floor(y2 / size) + 1)
+        )
+
+    def insert(self, key, bbox):
+        self._boxes[key] = bbox
+        columns, rows = self._cell_range(bbox)
+        for column in columns:
+            for row in rows:
+                self._cells.setdefault((column, row), []).append(key)
+
+    def query(self, bbox):
+        """Keys of every box intersecting bbox."""
+        x1, y1, x2, y2 = bbox
+        found = set()
+        columns, rows = self._cell_range(bbox)
+        for column in columns:
+            for row in rows:
+                for key in self._cells.get((column, row), ()):
+                    if key in found:
+                        continue
+                    bx1, by1, bx2, by2 = self._boxes[key]
+                    if bx1 <= x2 and bx2 >= x1 and by1 <= y2 and by2 >= y1:
+                        found.add(key)
+        return found
+
+    def __len__(self):
+        return len(self._boxes)
+
+
+def layout_forest(count=FOREST_TREE_COUNT, rng=None):
+    """Place `count` trees with varied parameters on a jittered grid.
+
+    Returns the trees and the total forest size. Every tree gets its own seed,
+    so a tree looks the same each time it is materialized.
+    """
+    if rng is None:
+        rng = make_rng()
+
+    # Roughly 16:9 arrangement of slots
+    columns = max(1, math.ceil(math.sqrt(count * 16 / 9 * SLOT_HEIGHT / SLOT_WIDTH)))
+    rows = max(1, math.ceil(count / columns))
+    jitter = SLOT_WIDTH // 4
+
+    trees = []
+    for index in range(count):
+        row, column = divmod(index, columns)
+        params = {
+            'height': int(rng.integers(MIN_HEIGHT, MAX_HEIGHT + 1)),
+            'width': int(rng.integers(MIN_WIDTH, MAX_WIDTH + 1)),
+            'layers': int(rng.integers(MIN_LAYERS, MAX_LAYERS + 1)),
+            'color': FOREST_COLORS[int(rng.integers(len(FOREST_COLORS)))],
+            'ornaments': int(rng.integers(0, MAX_ORNAMENTS + 1)),
+            'chains': int(rng.integers(0, MAX_CHAINS + 1)),
+            'seed': int(rng.integers(2 ** 31)),
+        }
+        x = column * SLOT_WIDTH + int(rng.integers(-jitter, jitter + 1)) + jitter
+        y = row * SLOT_HEIGHT
+        trees.append(ForestTree(params, x, y))
+
+    return trees, (columns * SLOT_WIDTH + 2 * jitter, rows * SLOT_HEIGHT)
+
+
+class ForestView:
+    """Scrollable window showing a forest, materializing only the trees in view."""
+
+    def __init__(self, root, lang='en', count=FOREST_TREE_COUNT, rng=None):
+        logger.info("Opening forest view", extra={'metadata': {'trees': count}})
+
+        self.window = tk.Toplevel(root)
+        self.window.title(TRANSLATIONS[lang]['forest_title'])
+        self.window.geometry(FOREST_WINDOW_SIZE)
+
+        self.trees, (self.world_width, self.world_height) = layout_forest(count, rng)
+        self.index = SpatialGrid()
+        for key, tree in enumerate(self.trees):
+            self.index.insert(key, tree.bbox)
+
+        self.canvas = tk.Canvas(
+            self.window,
+            bg=CANVAS_BACKGROUND,
+            scrollregion=(0, 0, self.world_width, self.world_height),
+            xscrollincrement=20,
+            yscrollincrement=20
+        )
+        x_scroll = ttk.Scrollbar(self.window, orient='horizontal', command=self._xview)
+        y_scroll = ttk.Scrollbar(self.window, orient='vertical', command=self._yview)
+        self.canvas.configure(xscrollcommand=x_scroll.set, yscrollcommand=y_scroll.set)
+
+        self.canvas.grid(row=0, column=0, sticky='nsew')
+        y_scroll.grid(row=0, column=1, sticky='ns')
+        x_scroll.grid(row=1, column=0, sticky='ew')
+        self.window.grid_rowconfigure(0, weight=1)
+        self.window.grid_columnconfigure(0, weight=1)
+
+        # Trees currently on the canvas, and recently built scenes kept for scrolling back
+        self.materialized = set()
+        self._scenes = OrderedDict()
+        self._update_job = None
+
+        self.canvas.bind('<Configure>', self._schedule_update)
+        self.canvas.bind('<MouseWheel>', self._on_mouse_wheel)
+        self.canvas.bind('<Shift-MouseWheel>', self._on_mouse_wheel)
+        self.canvas.bind('<Button-4>', self._on_mouse_wheel)
+        self.canvas.bind('<Button-5>', self._on_mouse_wheel)
+        self.canvas.bind('<ButtonPress-1>', lambda event: self.canvas.scan_mark(event.x, event.y))
+        self.canvas.bind('<B1-Motion>', self._on_drag)
+
+    def _xview(self, *args):
+        self.canvas.xview(*args)
+        self._schedule_update()
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self._schedule_update()
+
+    def _on_mouse_wheel(self, event):
+        """Scroll vertically, or horizontally with Shift held."""
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            units = -3
+        else:
+            units = 3
+        if event.state & 0x0001:  # Shift
+            self.canvas.xview_scroll(units, 'units')
+        else:
+            self.canvas.yview_scroll(units, 'units')
+        self._schedule_update()
+
+    def _on_drag(self, event):
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self._schedule_update()
+
+    def _schedule_update(self, event=None):
+        """Coalesce bursts of scroll events into at most one viewport update per frame."""
+        if self._update_job is None:
+            self._update_job = self.window.after(LIVE_PREVIEW_INTERVAL_MS, self.update_visible)
+
+    def _get_scene(self, key):
+        scene = self._scenes.get(key)
+        if scene is not None:
+            self._scenes.move_to_end(key)
+            return scene
+
+        scene = build_tree_scene(self.trees[key].params, SLOT_WIDTH, SLOT_HEIGHT)
+        self._scenes[key] = scene
+        if len(self._scenes) > FOREST_SCENE_CACHE_SIZE:
+            self._scenes.popitem(last=False)
+        return scene
+
+    def _materialize(self, key):
+        tree = self.trees[key]
+        tag = f"tree{key}"
+        create = {
+            'polygon': self.canvas.create_polygon,
+            'rect': self.canvas.create_rectangle,
+            'oval': self.canvas.create_oval,
+            'line': self.canvas.create_line,
+        }
+        for item in self._get_scene(key):
+            create[item.kind](item.coords, tags=(tag, item.tag), **item.style())
+        self.canvas.move(tag, tree.x, tree.y)
+
+    def visible_bbox(self):
+        """Viewport in forest coordinates, grown by the materialization margin."""
+        left = self.canvas.canvasx(0)
+        top = self.canvas.canvasy(0)
+        return (
+            left - FOREST_VIEW_MARGIN,
+            top - FOREST_VIEW_MARGIN,
+            left + self.canvas.winfo_width() + FOREST_VIEW_MARGIN,
+            top + self.canvas.winfo_height() + FOREST_VIEW_MARGIN
+        )
+
+    def update_visible(self):
+        """Create items for trees entering the viewport and delete those that left it."""
+        self._update_job = None
+        try:
+            visible = self.index.query(self.visible_bbox())
+
+            hidden = self.materialized - visible
+            for key in hidden:
+                self.canvas.delete(f"tree{key}")
+
+            # Create in index order so rows further down overlap the ones above
+            shown = sorted(visible - self.materialized)
+            for key in shown:
+                self._materialize(key)
+            if shown and hidden != self.materialized:
+                for key in sorted(visible):
+                    self.canvas.tag_raise(f"tree{key}")
+
+            self.materialized = visible
+            if shown or hidden:
+                logger.debug("Forest viewport updated", extra={'metadata': {
+                    'visible': len(visible), 'created': len(shown), 'deleted': len(hidden),
+                    'items': len(self.canvas.find_all())
+                }})
+
+        except Exception as e:
+            logger.error("Failed to update forest viewport", extra={'metadata': {'error': str(e)}}, exc_info=True)
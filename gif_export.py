@@ -0,0 +1,77 @@
+"""
+Streaming animated GIF export.
+
+Frames are rendered offscreen one at a time, quantized against a single
+palette shared by the whole animation and handed to the GIF encoder
+straight away, so memory use depends on the frame size, not on the number
+of frames.
+"""
+from PIL import GifImagePlugin, Image, ImageColor
+
+from raster_renderer import render_scene_image
+from tree_scene import ORNAMENT_COLORS, cycle_ornament_colors
+
+# Size of each frame in the palette reference montage, relative to the output
+PALETTE_SAMPLE_SCALE = 4
+
+# Minimum per-channel distance between an approximated blend and an exact scene color
+BLEND_MIN_DISTANCE = 8
+
+
+def build_shared_palette(scene, width, height, supersample):
+    """Palette image covering every color the animation will show.
+
+    Ornament colors repeat after len(ORNAMENT_COLORS) frames, so a small
+    montage of one full cycle contains every color and antialiasing blend.
+    The flat colors used by the scene are kept exact; the remaining palette
+    slots approximate the blends.
+    """
+    sample_width = max(1, width // PALETTE_SAMPLE_SCALE)
+    sample_height = max(1, height // PALETTE_SAMPLE_SCALE)
+    cycle = len(ORNAMENT_COLORS)
+
+    montage = Image.new('RGB', (sample_width * cycle, sample_height), scene.background)
+    for step in range(cycle):
+        frame = render_scene_image(cycle_ornament_colors(scene, step), sample_width, sample_height, supersample)
+        montage.paste(frame, (step * sample_width, 0))
+
+    exact = {ImageColor.getrgb(scene.background)}
+    for item in scene:
+        exact.add(ImageColor.getrgb(item.fill))
+        if item.outline:
+            exact.add(ImageColor.getrgb(item.outline))
+    exact.update(ImageColor.getrgb(color) for color in ORNAMENT_COLORS)
+    exact = sorted(exact)[:256]
+
+    blends = montage.quantize(colors=256 - len(exact), method=Image.Quantize.MEDIANCUT).getpalette()
+    blend_colors = [tuple(blends[i:i + 3]) for i in range(0, len(blends), 3)]
+    # Pillow maps pixels to a palette through a coarse color cache, so blends
+    # close to an exact color would steal its pixels; leave those out
+    blend_colors = [
+        color for color in blend_colors
+        if all(max(abs(a - b) for a, b in zip(color, key)) > BLEND_MIN_DISTANCE for key in exact)
+    ][:256 - len(exact)]
+
+    palette = Image.new('P', (1, 1))
+    palette.putpalette([channel for color in exact + blend_colors for channel in color])
+    return palette
+
+
+def write_scene_gif(scene, stream, frames, duration_ms, width, height, supersample):
+    """Stream a looping animation of the scene's ornaments cycling colors into a binary stream."""
+    palette = build_shared_palette(scene, width, height, supersample)
+
+    for index in range(frames):
+        rgb = render_scene_image(cycle_ornament_colors(scene, index), width, height, supersample)
+        frame = rgb.quantize(palette=palette, dither=Image.Dither.NONE)
+        del rgb
+
+        if index == 0:
+            header, _ = GifImagePlugin.getheader(frame, info={'loop': 0, 'duration': duration_ms})
+            for block in header:
+                stream.write(block)
+
+        for block in GifImagePlugin.getdata(frame, duration=duration_ms):
+            stream.write(block)
+
+    stream.write(b';')  # GIF trailer
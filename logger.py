@@ -2,17 +2,27 @@
 Moduł zapewniający spójne i czytelne logowanie w aplikacji
 """
 import logging
-import sys
 from datetime import datetime
 from enum import IntEnum
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
-import coloredlogs
-
 # Stała przechowująca nazwę projektu
 PROJECT_NAME: str = "TacticalChristmasTree"
 
+# Format logów
+LOG_FORMAT = (
+    '%(asctime)s.%(msecs)03d | '
+    '%(levelname)-8s | '
+    '%(name)s | '
+    '%(filename)s:%(lineno)d | '
+    '%(message)s'
+)
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Handlery współdzielone przez wszystkie loggery: jeden plik logu i jedna konsola na proces
+_shared_handlers = []
+
 
 class LogLevel(IntEnum):
     """Enumeration dla poziomów logowania"""
@@ -23,6 +33,57 @@ class LogLevel(IntEnum):
     CRITICAL = logging.CRITICAL
 
 
+def _create_shared_handlers(logger: logging.Logger) -> list:
+    """Tworzy handlery pliku i konsoli przy pierwszym loggerze i podpina je do niego"""
+    # Importowane dopiero tutaj, żeby sam import modułu był tani
+    import coloredlogs
+
+    # Utworzenie katalogu na logi w Dokumentach
+    documents_path = Path.home() / "Documents" / PROJECT_NAME
+    log_dir = documents_path / "logs"
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    # Handler dla plików logów
+    current_time = datetime.now().strftime('%d-%m-%Y_%H-%M')
+    log_file = log_dir / f"{PROJECT_NAME}_{current_time}.log"
+
+    file_handler = RotatingFileHandler(
+        log_file,
+        maxBytes=10 * 1024 * 1024,  # 10MB
+        backupCount=5,
+        encoding='utf-8',
+        delay=True
+    )
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
+    file_handler.setLevel(logging.DEBUG)
+
+    # Konfiguracja kolorowych logów w konsoli; handler dodany przez coloredlogs trafia do wspólnej puli
+    existing = set(logger.handlers)
+    coloredlogs.install(
+        level='DEBUG',
+        logger=logger,
+        fmt=LOG_FORMAT,
+        datefmt=DATE_FORMAT,
+        level_styles={
+            'debug': {'color': 'white'},
+            'info': {'color': 'green'},
+            'warning': {'color': 'yellow', 'bold': True},
+            'error': {'color': 'red', 'bold': True},
+            'critical': {'color': 'red', 'bold': True, 'background': 'white'}
+        },
+        field_styles={
+            'asctime': {'color': 'cyan'},
+            'levelname': {'color': 'white', 'bold': True},
+            'filename': {'color': 'magenta'},
+            'name': {'color': 'blue'},
+        }
+    )
+    console_handlers = [handler for handler in logger.handlers if handler not in existing]
+
+    logger.addHandler(file_handler)
+    return console_handlers + [file_handler]
+
+
 class NiceLogger:
     """
     Klasa zarządzająca logowaniem w aplikacji
@@ -32,65 +93,15 @@ class NiceLogger:
         self.logger = logging.getLogger(logger_name)
         self.logger.setLevel(logging.DEBUG)
 
-        # Utworzenie katalogu na logi w Dokumentach
-        documents_path = Path.home() / "Documents" / PROJECT_NAME
-        log_dir = documents_path / "logs"
-        log_dir.mkdir(parents=True, exist_ok=True)
-
-        # Format logów
-        self.log_format = (
-            '%(asctime)s.%(msecs)03d | '
-            '%(levelname)-8s | '
-            '%(name)s | '
-            '%(filename)s:%(lineno)d | '
-            '%(message)s'
-        )
-
-        self.date_format = '%Y-%m-%d %H:%M:%S'
-
-        # Konfiguracja formattera
-        formatter = logging.Formatter(self.log_format, self.date_format)
-
-        # Handler dla plików logów
-        current_time = datetime.now().strftime('%d-%m-%Y_%H-%M')
-        log_file = log_dir / f"{PROJECT_NAME}_{current_time}.log"
-
-        file_handler = RotatingFileHandler(
-            log_file,
-            maxBytes=10 * 1024 * 1024,  # 10MB
-            backupCount=5,
-            encoding='utf-8'
-        )
-        file_handler.setFormatter(formatter)
-        file_handler.setLevel(logging.DEBUG)
-
-        # Handler dla konsoli
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(formatter)
-
-        # Konfiguracja kolorowych logów w konsoli
-        coloredlogs.install(
-            level='DEBUG',
-            logger=self.logger,
-            fmt=self.log_format,
-            datefmt=self.date_format,
-            level_styles={
-                'debug': {'color': 'white'},
-                'info': {'color': 'green'},
-                'warning': {'color': 'yellow', 'bold': True},
-                'error': {'color': 'red', 'bold': True},
-                'critical': {'color': 'red', 'bold': True, 'background': 'white'}
-            },
-            field_styles={
-                'asctime': {'color': 'cyan'},
-                'levelname': {'color': 'white', 'bold': True},
-                'filename': {'color': 'magenta'},
-                'name': {'color': 'blue'},
-            }
-        )
-
-        # Dodanie handlerów do loggera
-        self.logger.addHandler(file_handler)
+        self.log_format = LOG_FORMAT
+        self.date_format = DATE_FORMAT
+
+        # Handlery powstają raz; kolejne loggery dostają te same obiekty
+        if not _shared_handlers:
+            _shared_handlers.extend(_create_shared_handlers(self.logger))
+        for handler in _shared_handlers:
+            if handler not in self.logger.handlers:
+                self.logger.addHandler(handler)
 
     def get_logger(self) -> logging.Logger:
         """Zwraca skonfigurowany logger"""
@@ -1,17 +1,32 @@
+import time
+
+# Taken before anything else is imported, as the reference point for time to first paint
+STARTUP_STARTED = time.perf_counter()
+
+import importlib
 import sys
+import threading
 import tkinter as tk
 import webbrowser
 from tkinter import ttk
 
 import sv_ttk
 
-from file_handler import save_canvas_as_image
 from logger import NiceLogger
-from settings import PROJECT_NAME, PROJECT_VERSION, ICON_PATH
+from settings import (
+    PROJECT_NAME, PROJECT_VERSION, ICON_PATH, ICON_PNG_PATH, STARTUP_BUDGET_MS, UPDATE_POLL_INTERVAL_MS,
+    ensure_user_dirs
+)
 from translations import TRANSLATIONS
 from tree_drawer import TreeDrawer
 from ui_components import UIComponents
-from update_checker import check_for_updates, install_update
+from update_worker import UpdateWorker, RESULT, PROGRESS
+
+# Animation, export, forest and update modules (NumPy, Pillow, requests) are imported on first use,
+# so the window can appear before they are loaded
+
+# Printed on stdout by --startup-probe, which exits right after the first paint
+STARTUP_PROBE_FLAG = '--startup-probe'
 
 # Initialize logger
 logger = NiceLogger(__name__).get_logger()
@@ -26,6 +41,8 @@ class TacticalChristmasTree:
         self.update_installer_path = None
         self.latest_version = None
         self.release_url = None
+        self.update_worker = None
+        self._update_poll_job = None
 
         try:
             logger.debug("Creating main window")
@@ -61,6 +78,9 @@ class TacticalChristmasTree:
                         }},
                         exc_info=True
                     )
+            else:
+                logger.warning("Icon files missing", extra={
+                    'metadata': {'ico_path': str(ICON_PATH), 'png_path': str(ICON_PNG_PATH)}})
 
             # Initial language setting
             self.current_lang = 'en'
@@ -90,6 +110,13 @@ class TacticalChristmasTree:
             self.drawer = TreeDrawer(self.root)
             logger.debug("Tree drawer initialized")
 
+            # Single frame loop shared by all canvas animations, created when first turned on
+            self.scheduler = None
+            self.twinkle = None
+            self.snowfall = None
+            self.ui.twinkle_var.trace_add('write', self.toggle_twinkle)
+            self.ui.snowfall_var.trace_add('write', self.toggle_snowfall)
+
             # Export button
             logger.debug("Creating export button")
             self.export_button = ttk.Button(
@@ -98,9 +125,19 @@ class TacticalChristmasTree:
                 command=self.export_tree,
                 state="disabled"
             )
-            self.export_button.pack(pady=20)
+            self.export_button.pack(pady=(20, 5))
             logger.debug("Export button created and packed")
 
+            # Forest mode button
+            logger.debug("Creating forest mode button")
+            self.forest_button = ttk.Button(
+                self.root,
+                text=TRANSLATIONS[self.current_lang]['forest_mode'],
+                command=self.open_forest
+            )
+            self.forest_button.pack(pady=5)
+            self.forest_view = None
+
             # Bottom frame for version and update info
             logger.debug("Creating bottom frame for version and updates")
             self.bottom_frame = ttk.Frame(self.root)
@@ -131,6 +168,10 @@ class TacticalChristmasTree:
 
             # Update now button
             self.update_now_button = ttk.Button(self.update_frame, style='Accent.TButton', command=self.update_now)
+
+            # Installer download progress, shown only while downloading
+            self.download_label = ttk.Label(self.update_frame, font=('Segoe UI', 8), foreground='gray')
+            self.download_progress = ttk.Progressbar(self.update_frame, length=100, maximum=100)
             logger.debug("Update notification components created")
 
             logger.info("Application initialized successfully")
@@ -212,6 +253,13 @@ class TacticalChristmasTree:
         try:
             logger.info("Application closing initiated")
 
+            # Stop the update worker; it only finishes its current request, bounded by the timeouts
+            if self.update_worker is not None:
+                self.update_worker.cancel()
+            if self._update_poll_job is not None:
+                self.root.after_cancel(self._update_poll_job)
+                self._update_poll_job = None
+
             logger.debug("Destroying main window")
             self.root.destroy()
             logger.debug("Main window destroyed successfully")
@@ -221,6 +269,7 @@ class TacticalChristmasTree:
                 logger.info("Installing update after close", extra={
                     'metadata': {'installer_path': self.update_installer_path, 'current_version': PROJECT_VERSION,
                                  'new_version': self.latest_version}})
+                from update_checker import install_update
                 install_update(self.update_installer_path)
                 logger.debug("Update installation process initiated")
 
@@ -254,6 +303,9 @@ class TacticalChristmasTree:
             self.export_button.config(
                 text=TRANSLATIONS[self.current_lang]['export_tree']
             )
+            self.forest_button.config(
+                text=TRANSLATIONS[self.current_lang]['forest_mode']
+            )
 
             # Update the update notification if it's visible
             if self.latest_version:
@@ -274,6 +326,47 @@ class TacticalChristmasTree:
                 exc_info=True
             )
 
+    def _ensure_animations(self):
+        """Create the frame scheduler and effects on first use."""
+        if self.scheduler is None:
+            logger.debug("Initializing animations")
+            from animation import FrameScheduler, TwinkleEffect, SnowfallEffect
+            self.scheduler = FrameScheduler(self.root)
+            self.twinkle = TwinkleEffect(self.drawer)
+            self.snowfall = SnowfallEffect(self.drawer)
+
+    def toggle_twinkle(self, *args):
+        """Start or stop the twinkling lights animation."""
+        try:
+            self._ensure_animations()
+            if self.ui.twinkle_var.get():
+                logger.info("Starting twinkle animation")
+                self.scheduler.add(self.twinkle)
+            else:
+                logger.info("Stopping twinkle animation", extra={'metadata': self.scheduler.get_stats()})
+                self.scheduler.remove(self.twinkle)
+                self.twinkle.stop()
+        except Exception as e:
+            logger.error("Failed to toggle twinkle animation",
+                         extra={'metadata': {'error': str(e), 'error_type': type(e).__name__}}, exc_info=True)
+
+    def toggle_snowfall(self, *args):
+        """Start or stop the snowfall animation."""
+        try:
+            self._ensure_animations()
+            if self.ui.snowfall_var.get():
+                logger.info("Starting snowfall animation")
+                self.snowfall.start()
+                self.scheduler.add(self.snowfall)
+            else:
+                logger.info("Stopping snowfall animation", extra={
+                    'metadata': {**self.scheduler.get_stats(), 'flakes': self.snowfall.active}})
+                self.scheduler.remove(self.snowfall)
+                self.snowfall.stop()
+        except Exception as e:
+            logger.error("Failed to toggle snowfall animation",
+                         extra={'metadata': {'error': str(e), 'error_type': type(e).__name__}}, exc_info=True)
+
     def draw_tree(self):
         """Draw the Christmas tree with current parameters."""
         params = None  # Initialize before try block
@@ -282,9 +375,6 @@ class TacticalChristmasTree:
             params = self.ui.get_parameters()
             logger.debug("Tree parameters obtained", extra={'metadata': params})
 
-            logger.debug("Clearing canvas")
-            self.drawer.clear_canvas()
-
             logger.debug("Drawing tree with parameters")
             self.drawer.draw_tree(params)
 
@@ -304,9 +394,14 @@ class TacticalChristmasTree:
         """Export the tree as an image."""
         try:
             logger.info("Tree export initiated")
-            logger.debug("Getting canvas for export")
-            save_canvas_as_image(self.drawer.canvas)
-            logger.info("Tree exported successfully")
+            if self.drawer.scene is None:
+                logger.warning("Nothing to export, the tree has not been drawn yet")
+                return
+
+            logger.debug("Rendering tree scene for export")
+            from file_handler import save_tree_as_image
+            if save_tree_as_image(self.drawer.scene, self.current_lang):
+                logger.info("Tree exported successfully")
 
         except Exception as e:
             logger.error(
@@ -314,25 +409,122 @@ class TacticalChristmasTree:
                 exc_info=True
             )
 
-    def run(self):
-        """Run the main application loop."""
+    def open_forest(self):
+        """Open the forest window, or bring the existing one to the front."""
         try:
-            logger.info("Starting application main loop")
+            if self.forest_view is not None and self.forest_view.window.winfo_exists():
+                logger.debug("Raising existing forest window")
+                self.forest_view.window.lift()
+                return
 
-            # Check for updates
-            logger.debug("Checking for updates")
-            update_info = check_for_updates()
+            from forest import ForestView
+            self.forest_view = ForestView(self.root, self.current_lang)
+            logger.info("Forest window opened")
 
-            if update_info:
-                logger.debug("Update available, processing update info", extra={'metadata': update_info})
-                self.update_installer_path = update_info['installer_path']
-                self.latest_version = update_info['version']
-                self.release_url = update_info['release_url']
+        except Exception as e:
+            logger.error(
+                "Failed to open forest window", extra={'metadata': {'error': str(e), 'error_type': type(e).__name__}},
+                exc_info=True
+            )
 
-                logger.debug("Showing update notification")
-                self.show_update_notification()
+    def start_update_check(self):
+        """Check for updates on a background worker; the window stays responsive meanwhile."""
+        try:
+            self.update_worker = UpdateWorker().start()
+            self._update_poll_job = self.root.after(UPDATE_POLL_INTERVAL_MS, self._poll_update_worker)
+        except Exception as e:
+            logger.error("Failed to start update check",
+                         extra={'metadata': {'error': str(e), 'error_type': type(e).__name__}}, exc_info=True)
+
+    def _poll_update_worker(self):
+        """Apply messages from the update worker on the Tk thread; keep polling while it runs."""
+        self._update_poll_job = None
+        worker = self.update_worker
+        # Read before draining, so a message put just before the worker exits is never missed
+        running = worker.running
+        try:
+            for kind, payload in worker.poll():
+                if kind == PROGRESS:
+                    self.show_download_progress(*payload)
+                elif kind == RESULT:
+                    self.hide_download_progress()
+                    self.apply_update_info(payload)
+        except Exception as e:
+            logger.error("Failed to process update check result",
+                         extra={'metadata': {'error': str(e), 'error_type': type(e).__name__}}, exc_info=True)
+
+        if running and not worker.cancelled:
+            self._update_poll_job = self.root.after(UPDATE_POLL_INTERVAL_MS, self._poll_update_worker)
+
+    def show_download_progress(self, done, total):
+        """Show how much of the installer has been downloaded."""
+        if total:
+            percent = min(100, done * 100 // total)
+            self.download_progress.config(mode='determinate', value=percent)
+            progress = f"{percent}%"
+        else:
+            self.download_progress.config(mode='indeterminate')
+            self.download_progress.step()
+            progress = f"{done / (1024 * 1024):.1f} MB"
+
+        self.download_label.config(text=TRANSLATIONS[self.current_lang]['downloading_update'].format(progress=progress))
+        if not self.download_progress.winfo_manager():
+            self.download_label.pack(side='left')
+            self.download_progress.pack(side='left', padx=(5, 0))
+
+    def hide_download_progress(self):
+        self.download_label.pack_forget()
+        self.download_progress.pack_forget()
+
+    def apply_update_info(self, update_info):
+        """Remember a downloaded update and show the notification."""
+        if update_info:
+            logger.debug("Update available, processing update info", extra={'metadata': update_info})
+            self.update_installer_path = update_info['installer_path']
+            self.latest_version = update_info['version']
+            self.release_url = update_info['release_url']
+
+            logger.debug("Showing update notification")
+            self.show_update_notification()
+        else:
+            logger.debug("No updates available")
+
+    def on_first_paint(self, probe=False):
+        """Record time to first paint, then start the work that was kept out of startup."""
+        try:
+            self.root.update_idletasks()
+            first_paint_ms = round((time.perf_counter() - STARTUP_STARTED) * 1000, 1)
+            metadata = {'first_paint_ms': first_paint_ms, 'budget_ms': STARTUP_BUDGET_MS}
+            if first_paint_ms > STARTUP_BUDGET_MS:
+                logger.warning("Time to first paint over budget", extra={'metadata': metadata})
             else:
-                logger.debug("No updates available")
+                logger.info("Window painted", extra={'metadata': metadata})
+
+            if probe:
+                print(f"first_paint_ms={first_paint_ms}", flush=True)
+                self.root.destroy()
+                return
+
+            ensure_user_dirs()
+
+            # Load the drawing stack in the background so the first draw doesn't pay for NumPy
+            threading.Thread(
+                target=importlib.import_module, args=('tree_scene',), name='preload', daemon=True
+            ).start()
+
+            self.start_update_check()
+
+        except Exception as e:
+            logger.error("Failed to finish startup",
+                         extra={'metadata': {'error': str(e), 'error_type': type(e).__name__}}, exc_info=True)
+
+    def run(self, probe=False):
+        """Run the main application loop."""
+        try:
+            logger.info("Starting application main loop")
+
+            # Deferred startup work runs once the window is on screen
+            self.root.after_idle(self.on_first_paint, probe)
 
             logger.debug("Starting tkinter main loop")
             self.root.mainloop()
@@ -348,9 +540,12 @@ class TacticalChristmasTree:
 
 
 if __name__ == "__main__":
+    # Poster export renders tiles in worker processes; needed for those to start in the frozen executable
+    import multiprocessing
+    multiprocessing.freeze_support()
     try:
         app = TacticalChristmasTree()
-        app.run()
+        app.run(probe=STARTUP_PROBE_FLAG in sys.argv[1:])
     except Exception as e:
         logger.critical(
             "Fatal application error",
@@ -0,0 +1,203 @@
+"""
+Batched ornament placement.
+
+The default 'random' layout samples all ornament centers in a single
+vectorized pass: a layer is picked for every ornament with probability
+proportional to its area and the point is drawn uniformly inside that
+triangle, so exactly N ornaments are placed in O(N) without any rejection.
+
+The 'even' layout uses Poisson-disk sampling (Bridson's algorithm) backed by a
+uniform-grid spatial hash, so ornaments never overlap each other or the
+layer edges and every neighbour check touches a constant number of cells.
+"""
+import math
+
+import numpy as np
+
+from settings import LAYOUT_RANDOM, LAYOUT_EVEN
+
+# Ornaments are pulled towards the layer centroid so they don't hang off the edges
+ORNAMENT_INSET = 0.8
+
+# Candidates tried around each active sample before it is retired
+POISSON_CANDIDATES = 30
+
+
+def triangle_arrays(layer_triangles):
+    """Stack layer triangle vertices into an (L, 3, 2) array."""
+    return np.array([layer['vertices'] for layer in layer_triangles], dtype=np.float64)
+
+
+def triangle_areas(triangles):
+    """Areas of an (L, 3, 2) array of triangles."""
+    a, b, c = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+    return 0.5 * np.abs(
+        (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (c[:, 0] - a[:, 0]) * (b[:, 1] - a[:, 1])
+    )
+
+
+def sample_in_triangles(triangles, count, rng, inset=ORNAMENT_INSET):
+    """Draw `count` points uniformly over the union of triangles, weighted by area.
+
+    Returns an (N, 2) array of points and an (N,) array with the index of the
+    triangle each point was drawn from.
+    """
+    if count <= 0 or len(triangles) == 0:
+        return np.empty((0, 2)), np.empty(0, dtype=np.intp)
+
+    areas = triangle_areas(triangles)
+    total = areas.sum()
+    if total <= 0:
+        return np.empty((0, 2)), np.empty(0, dtype=np.intp)
+
+    layer_idx = rng.choice(len(triangles), size=count, p=areas / total)
+    a = triangles[layer_idx, 0]
+    b = triangles[layer_idx, 1]
+    c = triangles[layer_idx, 2]
+
+    # Uniform barycentric sampling: fold points from the far half of the parallelogram back in
+    u = rng.random(count)
+    v = rng.random(count)
+    flip = u + v > 1.0
+    u[flip] = 1.0 - u[flip]
+    v[flip] = 1.0 - v[flip]
+
+    points = a + u[:, None] * (b - a) + v[:, None] * (c - a)
+
+    if inset != 1.0:
+        centroids = (a + b + c) / 3.0
+        points = centroids + inset * (points - centroids)
+
+    return points, layer_idx
+
+
+def _inset_edges(triangles, margin):
+    """Inward edge equations (nx, ny, c) per triangle; a point is `margin` clear of an edge when nx*x + ny*y >= c."""
+    edges = []
+    for tri in triangles:
+        # Flip the normals for clockwise triangles so they always point inwards
+        (x1, y1), (x2, y2), (x3, y3) = tri
+        orientation = 1.0 if (x2 - x1) * (y3 - y1) - (x3 - x1) * (y2 - y1) > 0 else -1.0
+        tri_edges = []
+        for (ax, ay), (bx, by) in (((x1, y1), (x2, y2)), ((x2, y2), (x3, y3)), ((x3, y3), (x1, y1))):
+            length = math.hypot(bx - ax, by - ay)
+            if length == 0:
+                continue
+            nx = -(by - ay) / length * orientation
+            ny = (bx - ax) / length * orientation
+            tri_edges.append((nx, ny, nx * ax + ny * ay + margin))
+        edges.append(tri_edges)
+    return edges
+
+
+def _inside_any(x, y, edges):
+    """Whether (x, y) lies inside at least one inset triangle."""
+    for tri_edges in edges:
+        if all(nx * x + ny * y >= c for nx, ny, c in tri_edges):
+            return True
+    return False
+
+
+def poisson_disk_in_triangles(triangles, min_distance, margin, rng):
+    """Bridson Poisson-disk sampling over the union of triangles shrunk by `margin`.
+
+    Every pair of points is at least `min_distance` apart. Points are stored
+    in a spatial hash with cells of min_distance / sqrt(2), so each cell holds
+    at most one point and a neighbour check only visits the surrounding 5x5
+    cells regardless of how many points have been placed.
+    """
+    edges = _inset_edges(triangles, margin)
+    cell_size = min_distance / math.sqrt(2)
+    min_distance_sq = min_distance * min_distance
+    grid = {}
+    points = []
+    active = []
+
+    def fits(x, y):
+        if not _inside_any(x, y, edges):
+            return False
+        cx = int(x // cell_size)
+        cy = int(y // cell_size)
+        for i in range(cx - 2, cx + 3):
+            for j in range(cy - 2, cy + 3):
+                other = grid.get((i, j))
+                if other is not None:
+                    dx = other[0] - x
+                    dy = other[1] - y
+                    if dx * dx + dy * dy < min_distance_sq:
+                        return False
+        return True
+
+    def accept(x, y):
+        grid[(int(x // cell_size), int(y // cell_size))] = (x, y)
+        points.append((x, y))
+        active.append(len(points) - 1)
+
+    # Seed every layer separately: the inset triangles don't touch, so growth can't cross between them
+    for tri in triangles:
+        seeds, _ = sample_in_triangles(tri[None, :, :], POISSON_CANDIDATES, rng, inset=1.0)
+        for x, y in seeds.tolist():
+            if fits(x, y):
+                accept(x, y)
+                break
+
+    while active:
+        slot = int(rng.integers(len(active)))
+        px, py = points[active[slot]]
+
+        # Candidates drawn uniformly from the annulus [r, 2r) around the active point
+        angles = rng.random(POISSON_CANDIDATES) * (2 * math.pi)
+        radii = min_distance * np.sqrt(1.0 + 3.0 * rng.random(POISSON_CANDIDATES))
+        xs = (px + radii * np.cos(angles)).tolist()
+        ys = (py + radii * np.sin(angles)).tolist()
+
+        for x, y in zip(xs, ys):
+            if fits(x, y):
+                accept(x, y)
+                break
+        else:
+            # Swap-remove so retiring an active point stays O(1)
+            active[slot] = active[-1]
+            active.pop()
+
+    return np.array(points, dtype=np.float64).reshape(-1, 2)
+
+
+def place_ornaments_even(layer_triangles, count, radius, rng, gap=2.0):
+    """Place up to `count` non-overlapping ornaments of `radius`, evenly spread over the tree.
+
+    The spacing grows with the free area so a small count still covers the
+    whole tree; if the tree is too small to fit `count` ornaments, fewer are
+    returned.
+    """
+    triangles = triangle_arrays(layer_triangles)
+    if count <= 0 or len(triangles) == 0:
+        return np.empty((0, 2))
+
+    closest = 2 * radius + gap
+    area = triangle_areas(triangles).sum()
+    # Poisson-disk packs roughly 0.7 / r^2 points per unit area
+    min_distance = max(closest, math.sqrt(0.7 * area / count))
+
+    points = poisson_disk_in_triangles(triangles, min_distance, radius, rng)
+    # Thin layers pack worse than the estimate; tighten the spacing until enough fit
+    while len(points) < count and min_distance > closest:
+        min_distance = max(closest, min_distance * 0.85)
+        points = poisson_disk_in_triangles(triangles, min_distance, radius, rng)
+
+    if len(points) > count:
+        points = points[rng.choice(len(points), size=count, replace=False)]
+    return points
+
+
+def place_ornaments(layer_triangles, count, rng=None, layout=LAYOUT_RANDOM, radius=0.0):
+    """Place ornament centers inside the layer triangles using the requested layout.
+
+    The random layout always places exactly `count` ornaments.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    if layout == LAYOUT_EVEN:
+        return place_ornaments_even(layer_triangles, count, radius, rng)
+    points, _ = sample_in_triangles(triangle_arrays(layer_triangles), count, rng)
+    return points
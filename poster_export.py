@@ -0,0 +1,138 @@
+"""
+Tiled poster export with bounded memory.
+
+The poster is rasterized in horizontal bands (full-width tiles) that are
+rendered in parallel worker processes and streamed, in order, through an
+incremental PNG encoder. Only a handful of bands exist at any moment, so
+peak memory depends on the tile size, not on the poster size.
+"""
+import os
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from raster_renderer import render_scene_band
+from settings import EXPORT_SUPERSAMPLE, POSTER_BAND_HEIGHT
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+IDAT_CHUNK_SIZE = 256 * 1024
+
+# Scene shared with every worker process through the pool initializer
+_worker_scene = None
+
+
+def _write_chunk(stream, chunk_type, data):
+    stream.write(struct.pack('>I', len(data)))
+    stream.write(chunk_type)
+    stream.write(data)
+    stream.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type)) & 0xFFFFFFFF))
+
+
+class PNGStreamWriter:
+    """Minimal 8-bit RGB PNG encoder that accepts rows incrementally."""
+
+    def __init__(self, stream, width, height, dpi=None, compression=6):
+        self.stream = stream
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._compressor = zlib.compressobj(compression)
+        self._pending = bytearray()
+
+        stream.write(PNG_SIGNATURE)
+        # Width, height, bit depth 8, color type 2 (RGB), default compression/filter/interlace
+        _write_chunk(stream, b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        if dpi:
+            pixels_per_meter = round(dpi / 0.0254)
+            _write_chunk(stream, b'pHYs', struct.pack('>IIB', pixels_per_meter, pixels_per_meter, 1))
+
+    def _flush_pending(self, final=False):
+        while len(self._pending) >= IDAT_CHUNK_SIZE or (final and self._pending):
+            chunk = bytes(self._pending[:IDAT_CHUNK_SIZE])
+            del self._pending[:IDAT_CHUNK_SIZE]
+            _write_chunk(self.stream, b'IDAT', chunk)
+
+    def write_rows(self, data):
+        """Append raw RGB rows (a multiple of width * 3 bytes)."""
+        stride = self.width * 3
+        for offset in range(0, len(data), stride):
+            # Filter type 0 (None) for every row
+            self._pending += self._compressor.compress(b'\x00')
+            self._pending += self._compressor.compress(data[offset:offset + stride])
+            self.rows_written += 1
+        self._flush_pending()
+
+    def close(self):
+        if self.rows_written != self.height:
+            raise ValueError(f"Expected {self.height} rows, got {self.rows_written}")
+        self._pending += self._compressor.flush()
+        self._flush_pending(final=True)
+        _write_chunk(self.stream, b'IEND', b'')
+
+
+def _init_worker(scene):
+    global _worker_scene
+    _worker_scene = scene
+
+
+def _render_band_bytes(width, height, top, band_height, supersample, scene=None):
+    """Raw RGB bytes of one band; uses the worker's shared scene unless one is passed."""
+    band = render_scene_band(
+        scene if scene is not None else _worker_scene, width, height, top, band_height, supersample
+    )
+    return band.tobytes()
+
+
+def _bands(height, band_height):
+    for top in range(0, height, band_height):
+        yield top, min(band_height, height - top)
+
+
+def write_scene_poster(scene, stream, width, height, dpi=None, supersample=EXPORT_SUPERSAMPLE,
+                       band_height=POSTER_BAND_HEIGHT, workers=None):
+    """Render the scene at width x height as a PNG written band by band into a binary stream.
+
+    With workers=1 every band is rendered in the calling process.
+    """
+    writer = PNGStreamWriter(stream, width, height, dpi)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for top, rows in _bands(height, band_height):
+            writer.write_rows(_render_band_bytes(width, height, top, rows, supersample, scene))
+        writer.close()
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(scene,)) as executor:
+        # Bands finish out of order but must be written in order; cap how many are held at once
+        max_in_flight = 2 * workers
+        bands = _bands(height, band_height)
+        in_flight = {}
+        finished = {}
+        next_top = 0
+
+        def submit_next():
+            try:
+                top, rows = next(bands)
+            except StopIteration:
+                return False
+            in_flight[executor.submit(_render_band_bytes, width, height, top, rows, supersample)] = top
+            return True
+
+        while len(in_flight) < max_in_flight and submit_next():
+            pass
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                finished[in_flight.pop(future)] = future.result()
+
+            while next_top in finished:
+                data = finished.pop(next_top)
+                writer.write_rows(data)
+                next_top += len(data) // (width * 3)
+
+            while len(in_flight) + len(finished) < max_in_flight and submit_next():
+                pass
+
+    writer.close()
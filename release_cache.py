@@ -0,0 +1,131 @@
+"""
+Throttled, conditional release polling with an on-disk cache.
+
+Only the latest stable release is kept, together with the ETag and
+Last-Modified validators of the response it came from. Within the minimum
+check interval the cached release is used without touching the network;
+after that the releases endpoint is asked with If-None-Match /
+If-Modified-Since, which normally answers 304 Not Modified (and does not
+count against GitHub's rate limit). When the network or the API is
+unavailable the cached answer is used instead.
+"""
+import json
+import os
+import time
+import uuid
+
+import requests
+
+from logger import NiceLogger
+from settings import RELEASE_CACHE_PATH, UPDATE_CHECK_INTERVAL_HOURS
+
+# Initialize logger
+logger = NiceLogger(__name__).get_logger()
+
+# Bump when the layout of the cache file changes
+RELEASE_CACHE_VERSION = 1
+
+
+def pick_latest_stable(releases):
+    """First non-prerelease, non-draft release of a newest-first listing, or None."""
+    return next((r for r in releases if not r.get('prerelease') and not r.get('draft')), None)
+
+
+class ReleaseCache:
+    """Latest stable release for a releases endpoint, cached in a JSON file."""
+
+    def __init__(self, path=RELEASE_CACHE_PATH, min_interval_seconds=UPDATE_CHECK_INTERVAL_HOURS * 3600):
+        self.path = path
+        self.min_interval_seconds = min_interval_seconds
+
+    def load(self, api_url):
+        """Cached entry for api_url, or None when missing, unreadable or for another endpoint."""
+        try:
+            entry = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if entry.get('version') != RELEASE_CACHE_VERSION or entry.get('url') != api_url:
+            return None
+        return entry
+
+    def save(self, entry):
+        """Write the entry atomically, so a crash never leaves a half-written cache."""
+        entry = dict(entry, version=RELEASE_CACHE_VERSION)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f"{self.path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            temp_path.write_text(json.dumps(entry), encoding='utf-8')
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            temp_path.unlink(missing_ok=True)
+            logger.warning("Failed to write release cache", extra={'metadata': {'error': str(e)}})
+
+    def is_fresh(self, entry, now=None):
+        now = time.time() if now is None else now
+        # A timestamp from the future (clock changes) counts as stale
+        return 0 <= now - entry.get('checked_at', 0) < self.min_interval_seconds
+
+    def latest_release(self, api_url, timeout=None, session=None):
+        """Latest stable release for api_url, from the cache when possible.
+
+        session is the requests session to send the check through, so its
+        connection can be reused for the download that may follow.
+
+        Raises requests.RequestException only when the network fails and
+        nothing is cached yet.
+        """
+        entry = self.load(api_url)
+        if entry is not None and self.is_fresh(entry):
+            logger.debug("Using cached release, checked recently", extra={
+                'metadata': {'checked_at': entry['checked_at'], 'min_interval_s': self.min_interval_seconds}
+            })
+            return entry['release']
+
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            logger.debug(f"Fetching releases from {api_url}", extra={'metadata': {'conditional': bool(headers)}})
+            response = (session or requests).get(api_url, headers=headers, timeout=timeout)
+            if response.status_code == 304 and entry is not None:
+                logger.debug("Releases not modified since last check")
+                entry['checked_at'] = time.time()
+                self.save(entry)
+                return entry['release']
+
+            response.raise_for_status()
+            releases = response.json()
+
+        except (requests.RequestException, ValueError) as e:
+            if entry is None:
+                raise
+            logger.warning("Release check failed, using cached release", extra={
+                'metadata': {'error': str(e), 'checked_at': entry.get('checked_at')}
+            })
+            return entry['release']
+
+        logger.debug(f'Found {len(releases)} releases')
+        release = pick_latest_stable(releases)
+        self.save({
+            'url': api_url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'checked_at': time.time(),
+            'release': release,
+        })
+        return release
+
+
+_release_cache = None
+
+
+def get_release_cache():
+    """Process-wide release cache, created on first use."""
+    global _release_cache
+    if _release_cache is None:
+        _release_cache = ReleaseCache()
+    return _release_cache
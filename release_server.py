@@ -0,0 +1,171 @@
+"""
+Local stand-in for the GitHub releases API.
+
+Serves a releases listing and the installer assets over HTTP on localhost,
+so the update checker can be exercised and benchmarked without network
+access. Installer downloads support Range/If-Range requests, the release
+publishes `.sha256` checksum files, and a connection can be made to drop
+mid-download to exercise resuming. Runs in a background thread:
+
+    with ReleaseServer(latest_version='9.9.9') as server:
+        check_for_updates(api_url=server.api_url)
+"""
+import hashlib
+import json
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from settings import PROJECT_NAME, PROJECT_VERSION, GITHUB_REPO
+
+RELEASES_PATH = '/repos/{owner}/{repo}/releases'
+DOWNLOAD_PREFIX = '/download/'
+
+
+class _ReleaseHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so clients can reuse connections; without Nagle, small responses on a
+    # reused connection aren't held back waiting for the client's delayed ACK
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        # Keep benchmark and test output clean
+        pass
+
+    def _send(self, status, body=b'', content_type='application/octet-stream', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server.release_server
+        server.requests.append(self.path)
+
+        if self.path == server.releases_path:
+            body = json.dumps(server.releases()).encode('utf-8')
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            validators = {'ETag': etag, 'Last-Modified': server.last_modified}
+            if self.headers.get('If-None-Match') == etag:
+                self._send(304, headers=validators)
+            else:
+                self._send(200, body, 'application/json', validators)
+        elif self.path.startswith(DOWNLOAD_PREFIX) and self.path[len(DOWNLOAD_PREFIX):] in server.assets:
+            self._send_asset(server, self.path[len(DOWNLOAD_PREFIX):])
+        else:
+            self._send(404, b'Not Found', 'text/plain')
+
+    def _send_asset(self, server, name):
+        data = server.assets[name]
+        validators = {'ETag': f'"{hashlib.sha1(data).hexdigest()}"', 'Last-Modified': server.last_modified,
+                      'Accept-Ranges': 'bytes'}
+        start = 0
+        requested = self.headers.get('Range', '')
+        if_range = self.headers.get('If-Range')
+        if requested.startswith('bytes=') and if_range in (None, validators['ETag'], validators['Last-Modified']):
+            first, _, last = requested[len('bytes='):].partition('-')
+            start = int(first)
+            if start >= len(data):
+                self._send(416, headers={'Content-Range': f"bytes */{len(data)}"})
+                return
+            end = int(last) + 1 if last else len(data)
+            validators['Content-Range'] = f"bytes {start}-{end - 1}/{len(data)}"
+            body = data[start:end]
+            status = 206
+        else:
+            body = data
+            status = 200
+
+        server.served_ranges.append(start)
+        interrupt = name == server.installer_name and self.command == 'GET' and len(body) > server.interrupt_after
+        if interrupt and server.interruptions > 0:
+            # Promise the whole body, send part of it and hang up
+            server.interruptions -= 1
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in validators.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body[:server.interrupt_after])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self._send(status, body, headers=validators)
+
+    do_HEAD = do_GET
+
+
+class ReleaseServer:
+    """Releases API on 127.0.0.1 with one stable release and its installer."""
+
+    def __init__(self, latest_version=PROJECT_VERSION, installer=b'\0' * 1024, port=0, checksum=True,
+                 interrupt_after=0, interruptions=0, extra_assets=None):
+        """checksum publishes `<asset>.sha256` next to every asset; the first
+        `interruptions` installer downloads are cut off after `interrupt_after`
+        bytes. extra_assets ({name: bytes}) are attached to the release too,
+        e.g. update deltas."""
+        _, _, _, owner, repo = GITHUB_REPO.rstrip('/').split('/')
+        self.releases_path = RELEASES_PATH.format(owner=owner, repo=repo)
+        self.latest_version = latest_version
+        self.installer_name = f"{PROJECT_NAME}-v{latest_version}_Setup.exe"
+        self.assets = {self.installer_name: installer, **(extra_assets or {})}
+        if checksum:
+            for name, data in list(self.assets.items()):
+                self.assets[name + '.sha256'] = f"{hashlib.sha256(data).hexdigest()}  {name}\n".encode('utf-8')
+        self.last_modified = formatdate(usegmt=True)
+        self.interrupt_after = interrupt_after
+        self.interruptions = interruptions
+        # Paths of every request received, in order, and the start offset of every asset served
+        self.requests = []
+        self.served_ranges = []
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), _ReleaseHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.release_server = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self):
+        return self.base_url + self.releases_path
+
+    def asset_url(self, name):
+        return f"{self.base_url}{DOWNLOAD_PREFIX}{name}"
+
+    def releases(self):
+        """Release listing in the shape of the GitHub API, newest first."""
+        return [{
+            'tag_name': f"v{self.latest_version}",
+            'prerelease': False,
+            'html_url': f"{GITHUB_REPO}/releases/tag/v{self.latest_version}",
+            'assets': [
+                {'name': name, 'size': len(data), 'browser_download_url': self.asset_url(name)}
+                for name, data in self.assets.items()
+            ]
+        }]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='release-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,259 @@
+"""
+Two-tier render cache.
+
+Computed scenes are stored under a key derived from the normalized draw
+parameters, as plain JSON that is validated when rebuilt; encoded images
+under a key derived from the scene's content. Both keys include the
+application version, so entries written by another release are never read.
+A bounded in-process LRU sits in front of an on-disk cache under
+USER_DATA_DIR that is pruned by total size and entry age. Only seeded trees
+are cached: without a seed every render is meant to be different.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from logger import NiceLogger
+from settings import (
+    RENDER_CACHE_DIR, RENDER_CACHE_MEMORY_BYTES, RENDER_CACHE_DISK_BYTES, RENDER_CACHE_MAX_AGE_DAYS,
+    RENDER_CACHE_QUANTUM, DEFAULT_ORNAMENTS, PROJECT_VERSION
+)
+
+# Initialize logger
+logger = NiceLogger(__name__).get_logger()
+
+# Bump whenever scene geometry or encoding changes so stale entries are never served
+CACHE_FORMAT_VERSION = 3
+
+
+def quantize(value, quantum=RENDER_CACHE_QUANTUM):
+    """Snap a slider value to the cache grid."""
+    return max(quantum, int(round(float(value) / quantum)) * quantum)
+
+
+def normalize_params(params):
+    """Canonical draw parameters: quantized sizes, integer counts, lower-case color.
+
+    Rendering uses the normalized values as well, so a cache hit is exactly
+    the tree that would have been drawn.
+    """
+    normalized = dict(params)
+    normalized['height'] = quantize(params['height'])
+    normalized['width'] = quantize(params['width'])
+    normalized['layers'] = int(round(float(params['layers'])))
+    normalized['ornaments'] = int(round(float(params.get('ornaments', DEFAULT_ORNAMENTS))))
+    normalized['chains'] = int(round(float(params.get('chains', 0))))
+    normalized['color'] = str(params['color']).lower()
+    return normalized
+
+
+def cache_key(kind, params, *extra):
+    """Content-addressed key for a cached artifact."""
+    payload = json.dumps(
+        {'version': CACHE_FORMAT_VERSION, 'app_version': PROJECT_VERSION, 'kind': kind, 'params': params,
+         'extra': extra},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class MemoryLRU:
+    """In-process LRU bounded by the total size of its values in bytes; safe to share between threads."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, size):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def discard(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.total_bytes -= entry[1]
+
+
+class DiskCache:
+    """Content-addressed file cache pruned by total bytes and entry age."""
+
+    def __init__(self, directory, max_bytes, max_age_seconds):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.total_bytes = None  # Computed lazily on first write
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return self.directory / key[:2] / key
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        if time.time() - path.stat().st_mtime > self.max_age_seconds:
+            return None
+        # Refresh mtime so pruning evicts the least recently used entries first
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def discard(self, key):
+        self._path(key).unlink(missing_ok=True)
+
+    def put(self, key, data):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a unique temp file and rename, so concurrent writers never expose partial entries
+        temp_path = path.with_name(f"{key}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            if self.total_bytes is None:
+                self._prune()
+            else:
+                self.total_bytes += len(data)
+                if self.total_bytes > self.max_bytes:
+                    self._prune()
+
+    def prune(self):
+        """Drop expired entries, then the least recently used ones until under the size cap."""
+        with self._lock:
+            self._prune()
+
+    def _prune(self):
+        now = time.time()
+        entries = []
+        for path in self.directory.glob('*/*'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if path.suffix == '.tmp':
+                # Left behind by a crashed writer
+                if now - stat.st_mtime > 3600:
+                    path.unlink(missing_ok=True)
+                continue
+            if now - stat.st_mtime > self.max_age_seconds:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        self.total_bytes = total
+        logger.debug("Render cache pruned", extra={'metadata': {'bytes': total, 'removed': removed}})
+
+
+class RenderCache:
+    """Scene and image cache keyed by normalized draw parameters."""
+
+    def __init__(self, directory=RENDER_CACHE_DIR, memory_bytes=RENDER_CACHE_MEMORY_BYTES,
+                 disk_bytes=RENDER_CACHE_DISK_BYTES, max_age_days=RENDER_CACHE_MAX_AGE_DAYS):
+        self.memory = MemoryLRU(memory_bytes)
+        self.disk = DiskCache(directory, disk_bytes, max_age_days * 24 * 3600)
+
+    def _get_or_create(self, key, create):
+        """Return cached bytes for key, computing and storing them on a miss."""
+        data = self.memory.get(key)
+        if data is not None:
+            return data
+
+        data = self.disk.get(key)
+        if data is None:
+            data = create()
+            self._store_on_disk(key, data)
+
+        self.memory.put(key, data, len(data))
+        return data
+
+    def _store_on_disk(self, key, data):
+        try:
+            self.disk.put(key, data)
+        except OSError as e:
+            logger.warning("Failed to write render cache entry", extra={'metadata': {'error': str(e)}})
+
+    def get_scene(self, params, canvas_width, canvas_height, build):
+        """Scene for params, built with build(params, width, height) on a miss.
+
+        An entry that can't be decoded counts as a miss and is deleted.
+        """
+        if params.get('seed') is None:
+            return build(params, canvas_width, canvas_height)
+
+        # tree_scene pulls in NumPy; only needed once something is cached
+        from tree_scene import scene_from_json, scene_to_json
+
+        key = cache_key('scene', params, canvas_width, canvas_height)
+        data = self._get_or_create(key, lambda: scene_to_json(build(params, canvas_width, canvas_height)))
+        try:
+            return scene_from_json(data)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Discarding unreadable render cache entry", extra={
+                'metadata': {'key': key, 'error': str(e)}
+            })
+            self.memory.discard(key)
+            self.disk.discard(key)
+            scene = build(params, canvas_width, canvas_height)
+            data = scene_to_json(scene)
+            self._store_on_disk(key, data)
+            self.memory.put(key, data, len(data))
+            return scene
+
+    def get_image(self, scene, options, encode):
+        """Encoded image bytes for the scene and render options, produced by encode() on a miss.
+
+        Keyed on what the scene draws, so a modified copy of a scene never gets the original's image.
+        """
+        if scene.params is None or scene.params.get('seed') is None:
+            return encode()
+        from tree_scene import scene_digest
+        return self._get_or_create(cache_key('image', scene_digest(scene), options), encode)
+
+
+_render_cache = None
+
+
+def get_render_cache():
+    """Process-wide render cache, created on first use."""
+    global _render_cache
+    if _render_cache is None:
+        _render_cache = RenderCache()
+    return _render_cache
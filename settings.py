@@ -1,11 +1,6 @@
 import os
 from pathlib import Path
 
-from logger import NiceLogger
-
-# Initialize logger
-logger = NiceLogger(__name__).get_logger()
-
 # Project information
 PROJECT_NAME = "TacticalChristmasTree"
 PROJECT_VERSION = "0.7.3"
@@ -20,10 +15,14 @@ LOGS_DIR = USER_DATA_DIR / "logs"
 TEMP_DIR = ROOT_DIR / "temp"
 BUILD_DIR = ROOT_DIR / "build"
 DIST_DIR = ROOT_DIR / "dist"
+RELEASES_ARCHIVE_DIR = ROOT_DIR / "releases"  # Executables of earlier builds, the sources of update deltas
+
+
+def ensure_user_dirs():
+    """Create the per-user data directories; called when first needed, not on import."""
+    USER_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
-# Ensure directories exist
-USER_DATA_DIR.mkdir(parents=True, exist_ok=True)
-LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
 # Build settings
 MAIN_SCRIPT = ROOT_DIR / "main.py"
@@ -32,19 +31,65 @@ MAIN_SCRIPT = ROOT_DIR / "main.py"
 ICON_PATH = ROOT_DIR / "assets" / "icon.ico"
 ICON_PNG_PATH = ROOT_DIR / "assets" / "icon.png"
 
-# Ensure icon files exist
-if not ICON_PATH.exists() or not ICON_PNG_PATH.exists():
-    logger.warning("Icon files missing", extra={
-        'metadata': {
-            'ico_path': str(ICON_PATH),
-            'png_path': str(ICON_PNG_PATH)
-        }
-    })
-
 # Application settings
 WINDOW_SIZE = "800x800"
 DEFAULT_LANGUAGE = "en"
 
+# Startup settings
+STARTUP_BUDGET_MS = 1500  # Time to first paint, from process start
+STARTUP_IMPORT_BUDGET_MS = 300  # Importing main.py, as reported by -X importtime
+
+# Canvas settings
+CANVAS_WIDTH = 600
+CANVAS_HEIGHT = 400
+CANVAS_BACKGROUND = "#2b2b2b"  # Dark background
+LIVE_PREVIEW_INTERVAL_MS = 16  # Coalesce slider changes into at most one redraw per frame
+
+# Zoom and level of detail settings
+ZOOM_MIN = 0.05
+ZOOM_MAX = 20.0
+ZOOM_STEP = 1.2  # Zoom factor per mouse wheel notch
+LOD_DROP_RADIUS = 0.5  # On-screen ornament radius in pixels below which ornaments are dropped
+LOD_DOT_RADIUS = 2.0  # ... below which ornaments are drawn as single-pixel dots
+LOD_CAP_RADIUS = 4.0  # ... from which ornament caps are drawn
+LOD_LAYER_MIN_HEIGHT = 3  # Layers shorter than this on screen collapse into one silhouette
+LOD_MIN_SEGMENT = 3  # Shortest garland segment kept, in pixels
+LOD_MIN_LINE_WIDTH = 0.5  # Thinner garlands are dropped
+
+# Export settings
+EXPORT_SCALE = 2  # Default export size relative to the canvas
+EXPORT_DPI = 192
+EXPORT_SUPERSAMPLE = 2  # Antialiasing factor for offscreen rendering
+GIF_FRAMES = 30  # Default length of animated exports
+GIF_FPS = 10
+POSTER_BAND_HEIGHT = 256  # Rows rendered per poster tile
+POSTER_MIN_PIXELS = 4096 * 4096  # Larger exports are rendered tile by tile
+POSTER_DEFAULT_WIDTH = 8000  # Width offered when exporting a poster from the window
+POSTER_MAX_WIDTH = 30000
+EXPORT_SIZES = {'thumbnail': 256, 'web': 1200, 'print': 4800}  # Output widths for multi-size export
+
+# Render cache settings
+RENDER_CACHE_DIR = USER_DATA_DIR / "cache"
+RENDER_CACHE_MEMORY_BYTES = 64 * 1024 * 1024  # 64MB in-process LRU
+RENDER_CACHE_DISK_BYTES = 512 * 1024 * 1024  # 512MB on disk
+RENDER_CACHE_MAX_AGE_DAYS = 30
+RENDER_CACHE_QUANTUM = 5  # Height/width are snapped to multiples of this many pixels
+
+# Animation settings
+ANIMATION_FPS = 30
+ANIMATION_FRAME_BUDGET_MS = 12  # Work per frame before the rest of the frame is dropped
+TWINKLE_FRACTION = 0.15  # Share of ornaments that change color each frame
+SNOW_MAX_FLAKES = 3000  # Size of the preallocated flake pool
+SNOW_INITIAL_FLAKES = 500
+SNOW_TARGET_FRAME_MS = 8  # Flake count adapts to keep a snow step under this
+
+# Forest settings
+FOREST_TREE_COUNT = 1000
+FOREST_CELL_SIZE = 512  # Spatial index cell size in pixels
+FOREST_VIEW_MARGIN = 200  # Trees this close to the viewport are materialized ahead of scrolling
+FOREST_SCENE_CACHE_SIZE = 256  # Built tree scenes kept for scrolling back
+FOREST_WINDOW_SIZE = "1000x700"
+
 # Tree size settings
 MIN_HEIGHT = 100
 MAX_HEIGHT = 350
@@ -55,6 +100,8 @@ MAX_LAYERS = 8
 DEFAULT_COLOR = "#2E8B57"
 
 # Decoration settings
+LAYOUT_RANDOM = 'random'  # Ornament layouts
+LAYOUT_EVEN = 'even'
 MIN_ORNAMENTS = 0  # Minimum number of ornaments
 MAX_ORNAMENTS = 15  # Maximum number of ornaments
 DEFAULT_ORNAMENTS = 5  # Default number of ornaments
@@ -63,6 +110,22 @@ MIN_CHAINS = 0  # Minimum number of chains
 MAX_CHAINS = 8  # Maximum number of chains
 DEFAULT_CHAINS = 3  # Default number of chains
 
+# Update settings
+RELEASE_CACHE_PATH = USER_DATA_DIR / "releases.json"
+UPDATE_CHECK_INTERVAL_HOURS = 6  # Minimum time between network checks; the cached release is used in between
+UPDATE_CONNECT_TIMEOUT = 5  # Seconds to establish a connection
+UPDATE_READ_TIMEOUT = 15  # Seconds to wait for the next bytes of a response
+UPDATE_POLL_INTERVAL_MS = 100  # How often the Tk thread checks for results from the update worker
+UPDATES_DIR = USER_DATA_DIR / "updates"  # Downloaded installers and partial downloads waiting to be resumed
+DOWNLOAD_MIN_CHUNK = 64 * 1024  # Smallest read size while downloading, in bytes
+DOWNLOAD_MAX_CHUNK = 4 * 1024 * 1024  # Largest read size while downloading, in bytes
+DOWNLOAD_CHUNK_SECONDS = 0.1  # Read size adapts so each read takes about this long
+DOWNLOAD_RETRIES = 3  # Resume attempts after a dropped connection before giving up
+DOWNLOAD_PROGRESS_INTERVAL = 0.1  # Minimum seconds between progress reports
+UPDATE_CACHE_MAX_MB = 500  # Size cap of cached installers and partial downloads
+UPDATE_PARTIAL_MAX_AGE_DAYS = 7  # Partial downloads not resumed within this time are deleted
+DELTA_BLOCK_SIZE = 64  # Bytes per indexed source block when creating deltas; smaller finds more matches, slower
+
 # Logging settings
 LOG_FILE_MAX_SIZE = 10 * 1024 * 1024  # 10MB
 LOG_BACKUP_COUNT = 5
@@ -0,0 +1,152 @@
+"""
+Startup time report and budget check.
+
+Imports main.py in fresh interpreters with -X importtime and reports where
+the import time goes, then (when a display is available) starts the app
+with --startup-probe to measure time to first paint. Exits with status 1
+when either number is over its budget from settings.
+
+Usage:
+    python startup_report.py
+    python startup_report.py --runs 5 --top 15 --json startup.json
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from settings import ROOT_DIR, STARTUP_BUDGET_MS, STARTUP_IMPORT_BUDGET_MS
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+FIRST_PAINT_LINE = re.compile(r'^first_paint_ms=([\d.]+)')
+PROBE_TIMEOUT = 60
+
+
+def parse_importtime(stderr):
+    """(module, self_ms, cumulative_ms, depth) for every line of -X importtime output."""
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us) / 1000, int(cumulative_us) / 1000, len(indent) // 2))
+    return modules
+
+
+def measure_imports(runs):
+    """Import main.py `runs` times; returns the parsed modules of the median run and all totals."""
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import main'],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        )
+        modules = parse_importtime(result.stderr)
+        total = next(cumulative for name, _, cumulative, depth in modules if name == 'main' and depth == 0)
+        samples.append((total, modules))
+
+    samples.sort(key=lambda sample: sample[0])
+    return samples[len(samples) // 2][1], [total for total, _ in samples]
+
+
+def measure_first_paint():
+    """Start the app with --startup-probe; returns (in-app ms, wall ms from spawn) or None without a display."""
+    started = time.perf_counter()
+    try:
+        result = subprocess.run(
+            [sys.executable, str(Path(ROOT_DIR) / 'main.py'), '--startup-probe'],
+            cwd=ROOT_DIR, capture_output=True, text=True, timeout=PROBE_TIMEOUT
+        )
+    except subprocess.TimeoutExpired:
+        return None
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    for line in result.stdout.splitlines():
+        match = FIRST_PAINT_LINE.match(line)
+        if match:
+            return float(match.group(1)), round(wall_ms, 1)
+    return None
+
+
+def build_report(runs=3, top=10, first_paint=True):
+    modules, totals = measure_imports(runs)
+    import_ms = sorted(totals)[len(totals) // 2]
+
+    report = {
+        'import_ms': round(import_ms, 1),
+        'import_budget_ms': STARTUP_IMPORT_BUDGET_MS,
+        'import_runs_ms': [round(total, 1) for total in totals],
+        # Direct imports of main by total cost, then the most expensive modules on their own
+        'top_level': [
+            {'module': name, 'cumulative_ms': round(cumulative, 2)}
+            for name, _, cumulative, depth in sorted(modules, key=lambda m: -m[2]) if depth == 1
+        ][:top],
+        'slowest': [
+            {'module': name, 'self_ms': round(self_ms, 2)}
+            for name, self_ms, _, _ in sorted(modules, key=lambda m: -m[1])
+        ][:top],
+        'first_paint_ms': None,
+        'first_paint_wall_ms': None,
+        'first_paint_budget_ms': STARTUP_BUDGET_MS,
+    }
+
+    if first_paint:
+        measured = measure_first_paint()
+        if measured:
+            report['first_paint_ms'], report['first_paint_wall_ms'] = measured
+    return report
+
+
+def print_report(report):
+    print(f"Import of main: {report['import_ms']} ms (budget {report['import_budget_ms']} ms, "
+          f"runs {report['import_runs_ms']})")
+    print("\nDirect imports of main (cumulative):")
+    for entry in report['top_level']:
+        print(f"  {entry['cumulative_ms']:9.2f} ms  {entry['module']}")
+    print("\nSlowest modules (self):")
+    for entry in report['slowest']:
+        print(f"  {entry['self_ms']:9.2f} ms  {entry['module']}")
+
+    if report['first_paint_ms'] is None:
+        print("\nTime to first paint: not measured (no display; try xvfb-run)")
+    else:
+        print(f"\nTime to first paint: {report['first_paint_ms']} ms in-app, "
+              f"{report['first_paint_wall_ms']} ms from process spawn (budget {report['first_paint_budget_ms']} ms)")
+
+
+def over_budget(report):
+    """Budget violations as readable strings."""
+    problems = []
+    if report['import_ms'] > report['import_budget_ms']:
+        problems.append(f"import of main took {report['import_ms']} ms > {report['import_budget_ms']} ms")
+    if report['first_paint_wall_ms'] is not None and report['first_paint_wall_ms'] > report['first_paint_budget_ms']:
+        problems.append(
+            f"first paint took {report['first_paint_wall_ms']} ms > {report['first_paint_budget_ms']} ms"
+        )
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report startup import cost and check the startup budgets.")
+    parser.add_argument('-n', '--runs', type=int, default=3, help="Import runs; the median is reported")
+    parser.add_argument('--top', type=int, default=10, help="Modules listed per section")
+    parser.add_argument('--no-first-paint', action='store_true', help="Skip starting the app window")
+    parser.add_argument('--json', default=None, help="Also save the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = build_report(args.runs, args.top, not args.no_first_paint)
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding='utf-8')
+
+    problems = over_budget(report)
+    for problem in problems:
+        print(f"OVER BUDGET: {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
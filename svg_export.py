@@ -0,0 +1,64 @@
+"""
+Streaming SVG export for tree scenes.
+
+Elements are written to the output one primitive at a time, so memory use
+stays flat no matter how many ornaments or trees are exported.
+"""
+from xml.sax.saxutils import quoteattr
+
+SVG_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<svg xmlns="http://www.w3.org/2000/svg" version="1.1" '
+    'width="{width}" height="{height}" viewBox="0 0 {width} {height}">\n'
+)
+SVG_FOOTER = '</svg>\n'
+
+
+def _num(value):
+    """Compact number formatting: two decimals, no trailing zeros."""
+    text = f"{value:.2f}".rstrip('0').rstrip('.')
+    return text if text != '-0' else '0'
+
+
+def svg_element(item):
+    """SVG markup for a single scene primitive."""
+    if item.kind == 'line':
+        points = ' '.join(
+            f"{_num(x)},{_num(y)}" for x, y in zip(item.coords[0::2], item.coords[1::2])
+        )
+        return (
+            f'<polyline points="{points}" fill="none" stroke={quoteattr(item.fill)} '
+            f'stroke-width="{_num(item.width)}" stroke-linejoin="round"/>\n'
+        )
+
+    style = f'fill={quoteattr(item.fill)} stroke={quoteattr(item.outline)}'
+
+    if item.kind == 'polygon':
+        points = ' '.join(
+            f"{_num(x)},{_num(y)}" for x, y in zip(item.coords[0::2], item.coords[1::2])
+        )
+        return f'<polygon points="{points}" {style}/>\n'
+
+    x1, y1, x2, y2 = item.coords
+    if item.kind == 'rect':
+        return (
+            f'<rect x="{_num(min(x1, x2))}" y="{_num(min(y1, y2))}" '
+            f'width="{_num(abs(x2 - x1))}" height="{_num(abs(y2 - y1))}" {style}/>\n'
+        )
+    if item.kind == 'oval':
+        return (
+            f'<ellipse cx="{_num((x1 + x2) / 2)}" cy="{_num((y1 + y2) / 2)}" '
+            f'rx="{_num(abs(x2 - x1) / 2)}" ry="{_num(abs(y2 - y1) / 2)}" {style}/>\n'
+        )
+    return ''
+
+
+def write_scene_svg(scene, stream):
+    """Stream a scene as an SVG document into a text stream."""
+    stream.write(SVG_HEADER.format(width=scene.width, height=scene.height))
+    stream.write(
+        f'<rect x="0" y="0" width="{scene.width}" height="{scene.height}" fill={quoteattr(scene.background)}/>\n'
+    )
+    for item in scene:
+        stream.write(svg_element(item))
+    stream.write(SVG_FOOTER)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The application is a set of top-level modules, not a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
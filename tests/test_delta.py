@@ -0,0 +1,119 @@
+import hashlib
+import os
+import zlib
+
+import pytest
+
+from artifact_cache import ArtifactCache
+from delta import HEADER, DeltaError, apply_delta, delta_name, make_delta
+from release_cache import ReleaseCache
+from release_server import ReleaseServer
+from settings import PROJECT_VERSION
+from update_checker import check_for_updates
+
+LATEST_VERSION = '999.0.0'
+
+
+@pytest.fixture
+def installed():
+    """An installed executable and the next version's installer, which mostly contains it."""
+    executable = os.urandom(256 * 1024)
+    installer = b'SETUP' * 100 + executable[:100000] + os.urandom(2000) + executable[100000:]
+    return executable, installer
+
+
+def test_roundtrip(tmp_path, installed):
+    source, target = installed
+    delta = make_delta(source, target)
+    (tmp_path / 'source').write_bytes(source)
+    (tmp_path / 'delta').write_bytes(delta)
+
+    apply_delta(tmp_path / 'source', tmp_path / 'delta', tmp_path / 'target', hashlib.sha256(target).hexdigest())
+
+    assert (tmp_path / 'target').read_bytes() == target
+    assert len(delta) < len(target) // 10
+
+
+def test_roundtrip_unrelated_and_empty_files(tmp_path):
+    for source, target in ((os.urandom(5000), os.urandom(7000)), (b'', b'abc'), (b'abc', b'')):
+        (tmp_path / 'source').write_bytes(source)
+        (tmp_path / 'delta').write_bytes(make_delta(source, target))
+        apply_delta(tmp_path / 'source', tmp_path / 'delta', tmp_path / 'target')
+        assert (tmp_path / 'target').read_bytes() == target
+
+
+def test_wrong_source_is_rejected(tmp_path, installed):
+    source, target = installed
+    (tmp_path / 'source').write_bytes(source[:-1] + b'?')
+    (tmp_path / 'delta').write_bytes(make_delta(source, target))
+
+    with pytest.raises(DeltaError):
+        apply_delta(tmp_path / 'source', tmp_path / 'delta', tmp_path / 'target')
+    assert not (tmp_path / 'target').exists()
+
+
+def test_truncated_delta_is_rejected(tmp_path, installed):
+    source, target = installed
+    (tmp_path / 'source').write_bytes(source)
+    delta = make_delta(source, target)
+
+    # Cut inside the compressed stream, and a complete stream that ends inside an operation
+    for broken in (delta[:-10], delta[:HEADER.size] + zlib.compress(b'C\0\0'), delta[:HEADER.size - 1]):
+        (tmp_path / 'delta').write_bytes(broken)
+        with pytest.raises(DeltaError):
+            apply_delta(tmp_path / 'source', tmp_path / 'delta', tmp_path / 'target')
+        assert not (tmp_path / 'target').exists()
+        assert not (tmp_path / 'target.part').exists()
+
+
+def test_result_not_matching_published_installer_is_rejected(tmp_path, installed):
+    source, target = installed
+    (tmp_path / 'source').write_bytes(source)
+    (tmp_path / 'delta').write_bytes(make_delta(source, target))
+
+    with pytest.raises(DeltaError):
+        apply_delta(tmp_path / 'source', tmp_path / 'delta', tmp_path / 'target', hashlib.sha256(b'other').hexdigest())
+
+
+def check(tmp_path, server, source):
+    (tmp_path / 'installed.exe').write_bytes(source)
+    return check_for_updates(
+        api_url=server.api_url,
+        release_cache=ReleaseCache(tmp_path / 'releases.json', min_interval_seconds=0),
+        artifact_cache=ArtifactCache(tmp_path / 'updates'),
+        delta_source=tmp_path / 'installed.exe'
+    )
+
+
+def downloads(server):
+    return [path.rsplit('/', 1)[-1] for path in server.requests if not path.endswith('.sha256')]
+
+
+def test_update_uses_delta(tmp_path, installed):
+    source, installer = installed
+    name = delta_name(PROJECT_VERSION, LATEST_VERSION)
+    with ReleaseServer(LATEST_VERSION, installer, extra_assets={name: make_delta(source, installer)}) as server:
+        result = check(tmp_path, server, source)
+
+        assert downloads(server)[-1] == name
+        assert server.installer_name not in downloads(server)
+    assert open(result['installer_path'], 'rb').read() == installer
+
+
+@pytest.mark.parametrize('case', ['wrong source', 'corrupt delta', 'different installer'])
+def test_update_falls_back_to_full_installer(tmp_path, installed, case):
+    source, installer = installed
+    if case == 'wrong source':
+        delta, source = make_delta(source, installer), source[::-1]
+    elif case == 'corrupt delta':
+        delta = make_delta(source, installer)[:-10]
+    else:
+        delta = make_delta(source, installer + b'!')
+
+    name = delta_name(PROJECT_VERSION, LATEST_VERSION)
+    with ReleaseServer(LATEST_VERSION, installer, extra_assets={name: delta}) as server:
+        result = check(tmp_path, server, source)
+
+        assert downloads(server)[-2:] == [name, server.installer_name]
+    assert open(result['installer_path'], 'rb').read() == installer
+    assert not (tmp_path / 'updates' / name).exists()
@@ -0,0 +1,68 @@
+from tree_drawer import TreeDrawer
+from tree_scene import build_tree_scene
+from viewport import ViewTransform
+
+PARAMS = {'height': 300, 'width': 200, 'layers': 5, 'color': '#2e8b57', 'ornaments': 6, 'chains': 2, 'seed': 7}
+
+
+class FakeCanvas:
+    """Just enough of tk.Canvas to follow the stacking order of items."""
+
+    def __init__(self):
+        self.display_list = []
+        self.tags = {}
+        self.next_id = 0
+
+    def _create(self, coords, tags=None, **options):
+        self.next_id += 1
+        self.display_list.append(self.next_id)
+        self.tags[self.next_id] = tags
+        return self.next_id
+
+    def delete(self, item_id):
+        self.display_list.remove(item_id)
+        del self.tags[item_id]
+
+    def coords(self, item_id, *coords):
+        pass
+
+    def itemconfig(self, item_id, **options):
+        pass
+
+    def tag_raise(self, tag_or_id):
+        # Like Tk, raising a tag keeps the order of its items
+        raised = [item_id for item_id in self.display_list if tag_or_id in (item_id, self.tags[item_id])]
+        self.display_list = [item_id for item_id in self.display_list if item_id not in raised] + raised
+
+    def winfo_width(self):
+        return 800
+
+    def winfo_height(self):
+        return 600
+
+
+def make_drawer():
+    drawer = TreeDrawer.__new__(TreeDrawer)
+    drawer.canvas = FakeCanvas()
+    drawer.scene = None
+    drawer._pools = {}
+    drawer.view = ViewTransform()
+    drawer.generation = 0
+    drawer._create_item = {kind: drawer.canvas._create for kind in ('polygon', 'rect', 'oval', 'line')}
+    return drawer
+
+
+def stacked_tags(drawer):
+    return [drawer.canvas.tags[item_id] for item_id in drawer.canvas.display_list]
+
+
+def test_items_are_stacked_in_scene_order():
+    drawer = make_drawer()
+    drawer.render_scene(build_tree_scene(dict(PARAMS, ornaments=3), 800, 600))
+
+    # More ornaments: new ornaments and caps must still interleave, each cap above its ornament
+    scene = build_tree_scene(PARAMS, 800, 600)
+    drawer.render_scene(scene)
+
+    assert stacked_tags(drawer) == [item.tag for item in scene]
+    assert stacked_tags(drawer).count('ornament') == PARAMS['ornaments']
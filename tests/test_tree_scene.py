@@ -0,0 +1,34 @@
+import pytest
+
+from ornament_placement import LAYOUT_EVEN, LAYOUT_RANDOM
+from tree_scene import build_tree_scene
+
+PARAMS = {'height': 300, 'width': 200, 'layers': 5, 'color': '#2e8b57', 'ornaments': 15, 'chains': 3}
+
+
+@pytest.mark.parametrize('layout', [LAYOUT_RANDOM, LAYOUT_EVEN])
+def test_same_seed_builds_identical_scene(layout):
+    params = dict(PARAMS, seed=42, layout=layout)
+
+    first = build_tree_scene(params, 800, 600)
+    second = build_tree_scene(dict(params), 800, 600)
+
+    assert len(first) > 0
+    assert first.items == second.items
+
+
+def test_different_seed_builds_different_scene():
+    first = build_tree_scene(dict(PARAMS, seed=1), 800, 600)
+    second = build_tree_scene(dict(PARAMS, seed=2), 800, 600)
+
+    assert first.items != second.items
+
+
+def test_seed_only_affects_decorations():
+    first = build_tree_scene(dict(PARAMS, seed=1), 800, 600)
+    second = build_tree_scene(dict(PARAMS, seed=2), 800, 600)
+
+    def undecorated(scene):
+        return [item for item in scene if item.tag in ('layer', 'trunk', 'garland')]
+
+    assert undecorated(first) == undecorated(second)
@@ -0,0 +1,35 @@
+from artifact_cache import ArtifactCache
+from release_cache import ReleaseCache
+from release_server import ReleaseServer
+from update_checker import check_for_updates
+
+INSTALLER = b'installer' * 1000
+
+
+def check(tmp_path, server):
+    return check_for_updates(
+        api_url=server.api_url,
+        release_cache=ReleaseCache(tmp_path / 'releases.json', min_interval_seconds=0),
+        artifact_cache=ArtifactCache(tmp_path / 'updates')
+    )
+
+
+def test_installer_is_verified_against_published_checksum(tmp_path):
+    with ReleaseServer('999.0.0', INSTALLER) as server:
+        server.assets[server.installer_name + '.sha256'] = b'0' * 64 + b'  installer\n'
+        assert check(tmp_path, server) is None
+
+
+def test_unreachable_checksum_does_not_skip_update(tmp_path):
+    with ReleaseServer('999.0.0', INSTALLER) as server:
+        # Listed in the release, but answers 404
+        checksum = server.assets.pop(server.installer_name + '.sha256')
+        server.releases = lambda: [dict(release, assets=release['assets'] + [{
+            'name': server.installer_name + '.sha256', 'size': len(checksum),
+            'browser_download_url': server.asset_url('missing.sha256')
+        }]) for release in ReleaseServer.releases(server)]
+
+        result = check(tmp_path, server)
+
+    assert result is not None
+    assert open(result['installer_path'], 'rb').read() == INSTALLER
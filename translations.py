@@ -14,8 +14,18 @@ TRANSLATIONS = {
         'update_info': 'Update will be installed automatically on exit',
         'update_now': 'Update now',
         'see_release': 'See release notes',
+        'downloading_update': 'Downloading update... {progress}',
+        'poster_title': 'Poster size',
+        'poster_width': 'Poster width in pixels:',
         'ornaments': 'Ornaments:',  
-        'chains': 'Chains:'         
+        'chains': 'Chains:',
+        'even_spacing': 'Even spacing',
+        'live_preview': 'Live preview',
+        'seed': 'Seed:',
+        'twinkle': 'Twinkling lights',
+        'snowfall': 'Snowfall',
+        'forest_mode': 'Forest mode',
+        'forest_title': 'Tactical Forest'
     },
     'pl': {
         'window_title': 'Taktyczna Choinka',
@@ -32,7 +42,17 @@ TRANSLATIONS = {
         'update_info': 'Aktualizacja zostanie zainstalowana automatycznie po zamknięciu',
         'update_now': 'Aktualizuj teraz',
         'see_release': 'Zobacz szczegóły wydania',
+        'downloading_update': 'Pobieranie aktualizacji... {progress}',
+        'poster_title': 'Rozmiar plakatu',
+        'poster_width': 'Szerokość plakatu w pikselach:',
         'ornaments': 'Bombki:',     
-        'chains': 'Łańcuchy:'       
+        'chains': 'Łańcuchy:',
+        'even_spacing': 'Równe odstępy',
+        'live_preview': 'Podgląd na żywo',
+        'seed': 'Ziarno:',
+        'twinkle': 'Migające światełka',
+        'snowfall': 'Padający śnieg',
+        'forest_mode': 'Tryb lasu',
+        'forest_title': 'Taktyczny Las'
     }
 }
\ No newline at end of file
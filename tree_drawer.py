@@ -1,7 +1,11 @@
-import random
 import tkinter as tk
 
 from logger import NiceLogger
+from settings import (
+    CANVAS_WIDTH, CANVAS_HEIGHT, CANVAS_BACKGROUND, LIVE_PREVIEW_INTERVAL_MS, ZOOM_MIN, ZOOM_MAX, ZOOM_STEP
+)
+from render_cache import get_render_cache, normalize_params
+from viewport import ViewTransform, view_scene
 
 logger = NiceLogger(__name__).get_logger()
 
@@ -11,156 +15,188 @@ class TreeDrawer:
         logger.debug("Initializing TreeDrawer")
         self.canvas = tk.Canvas(
             root,
-            width=600,
-            height=400,
-            bg='#2b2b2b'  # Dark background
+            width=CANVAS_WIDTH,
+            height=CANVAS_HEIGHT,
+            bg=CANVAS_BACKGROUND
         )
         self.canvas.pack(pady=10)
 
-    def get_random_color(self):
+        # Last scene replayed onto the canvas
+        self.scene = None
+
+        # Retained canvas items per scene tag, as (item_id, primitive) pairs in stacking order
+        self._pools = {}
+
+        # Zoom and pan applied on top of the scene; bumped whenever items are created
+        self.view = ViewTransform()
+        self.generation = 0
+        self._view_job = None
+        self._drag_origin = None
+
+        self._create_item = {
+            'polygon': self.canvas.create_polygon,
+            'rect': self.canvas.create_rectangle,
+            'oval': self.canvas.create_oval,
+            'line': self.canvas.create_line,
+        }
+
+        self.canvas.bind('<MouseWheel>', self._on_mouse_wheel)
+        self.canvas.bind('<Button-4>', self._on_mouse_wheel)
+        self.canvas.bind('<Button-5>', self._on_mouse_wheel)
+        self.canvas.bind('<ButtonPress-1>', self._on_drag_start)
+        self.canvas.bind('<B1-Motion>', self._on_drag)
+        self.canvas.bind('<Double-Button-1>', self.reset_view)
+
+    def get_random_color(self, rng=None):
         """Generate a random bright color for decorations."""
-        colors = [
-            '#FF0000', '#FFD700', '#00FF00', '#FF69B4', '#00FFFF',
-            '#FF4500', '#9400D3', '#FF1493', '#00FF7F', '#FF8C00'
-        ]
-        return random.choice(colors)
-
-    def is_point_in_triangle(self, px, py, x1, y1, x2, y2, x3, y3):
-        """Check if point (px,py) is inside triangle with vertices (x1,y1), (x2,y2), (x3,y3)."""
-
-        def sign(x1, y1, x2, y2, x3, y3):
-            return (x1 - x3) * (y2 - y3) - (x2 - x3) * (y1 - y3)
-
-        d1 = sign(px, py, x1, y1, x2, y2)
-        d2 = sign(px, py, x2, y2, x3, y3)
-        d3 = sign(px, py, x3, y3, x1, y1)
-
-        has_neg = (d1 < 0) or (d2 < 0) or (d3 < 0)
-        has_pos = (d1 > 0) or (d2 > 0) or (d3 > 0)
-
-        return not (has_neg and has_pos)
-
-    def draw_ornament(self, x, y, size=8):
-        """Draw a Christmas ornament (bauble)."""
-        color = self.get_random_color()
-        # Draw the bauble
-        self.canvas.create_oval(
-            x - size, y - size,
-            x + size, y + size,
-            fill=color,
-            outline='#1f1f1f'
-        )
-        # Draw the cap of the bauble
-        self.canvas.create_rectangle(
-            x - size / 3, y - size - 2,
-            x + size / 3, y - size,
-            fill='#C0C0C0',
-            outline='#1f1f1f'
-        )
+        from tree_scene import get_random_color
+        return get_random_color(rng)
 
     def clear_canvas(self):
         """Clear the canvas."""
         logger.debug("Clearing canvas")
         self.canvas.delete("all")
+        self.scene = None
+        self._pools = {}
+
+    def _create(self, item):
+        return self._create_item[item.kind](
+            item.coords,
+            tags=item.tag,
+            **item.style()
+        )
+
+    def render_scene(self, scene):
+        """Show a scene through the current view transform, reusing existing canvas items."""
+        self.scene = scene
+        self._sync_items(view_scene(
+            scene, self.view, self.canvas.winfo_width(), self.canvas.winfo_height()
+        ))
+
+    def _sync_items(self, scene):
+        """Bring the canvas items in line with a scene already in canvas coordinates.
+
+        Items are matched per tag by position. Matching items are updated in
+        place with coords/itemconfig only when they actually changed; items
+        are created or deleted only when a tag's item count changes.
+        """
+        groups = {}
+        for position, item in enumerate(scene):
+            groups.setdefault(item.tag, []).append((position, item))
+
+        stats = {'created': 0, 'updated': 0, 'deleted': 0}
+        new_pools = {}
+        # Canvas item id of every scene item, in scene order
+        stacking = [None] * len(scene)
+
+        for tag, items in groups.items():
+            pool = self._pools.pop(tag, [])
+            new_pool = []
+
+            for index, (position, item) in enumerate(items):
+                if index >= len(pool):
+                    item_id = self._create(item)
+                    new_pool.append((item_id, item))
+                    stacking[position] = item_id
+                    stats['created'] += 1
+                    continue
+
+                item_id, old = pool[index]
+                if old.kind != item.kind:
+                    self.canvas.delete(item_id)
+                    item_id = self._create(item)
+                    stats['created'] += 1
+                elif old != item:
+                    if old.coords != item.coords:
+                        self.canvas.coords(item_id, *item.coords)
+                    style = item.style()
+                    if old.style() != style:
+                        self.canvas.itemconfig(item_id, **style)
+                    stats['updated'] += 1
+                new_pool.append((item_id, item))
+                stacking[position] = item_id
+
+            for item_id, _ in pool[len(items):]:
+                self.canvas.delete(item_id)
+                stats['deleted'] += 1
+
+            new_pools[tag] = new_pool
+
+        # Tags missing from the new scene
+        for pool in self._pools.values():
+            for item_id, _ in pool:
+                self.canvas.delete(item_id)
+                stats['deleted'] += 1
+
+        # New items are created on top; raising every item in scene order restores the
+        # painter's order, also between tags whose items interleave (e.g. ornaments and caps)
+        if stats['created']:
+            for item_id in stacking:
+                self.canvas.tag_raise(item_id)
+            self.generation += 1
+
+        self._pools = new_pools
+        logger.debug("Scene rendered", extra={'metadata': stats})
+
+    def _schedule_view_update(self):
+        """Coalesce zoom and drag events into at most one re-render per frame."""
+        if self._view_job is None:
+            self._view_job = self.canvas.after(LIVE_PREVIEW_INTERVAL_MS, self._update_view)
+
+    def _update_view(self):
+        self._view_job = None
+        if self.scene is not None:
+            self.render_scene(self.scene)
+
+    def _on_mouse_wheel(self, event):
+        """Zoom around the mouse pointer."""
+        zoom_in = event.num == 4 or getattr(event, 'delta', 0) > 0
+        factor = ZOOM_STEP if zoom_in else 1 / ZOOM_STEP
+        # Keep the zoom within limits
+        factor = min(max(factor, ZOOM_MIN / self.view.scale), ZOOM_MAX / self.view.scale)
+        if factor != 1:
+            self.view.zoom_at(factor, event.x, event.y)
+            self._schedule_view_update()
+
+    def _on_drag_start(self, event):
+        self._drag_origin = (event.x, event.y)
+
+    def _on_drag(self, event):
+        """Pan the view with the mouse."""
+        if self._drag_origin is None:
+            return
+        self.view.pan(event.x - self._drag_origin[0], event.y - self._drag_origin[1])
+        self._drag_origin = (event.x, event.y)
+        self._schedule_view_update()
+
+    def reset_view(self, event=None):
+        """Back to the unzoomed, centered view."""
+        logger.debug("Resetting view", extra={'metadata': {'scale': self.view.scale}})
+        self.view.reset()
+        self._schedule_view_update()
+
+    def item_ids(self, tag):
+        """Canvas item ids currently showing the given scene tag, in stacking order."""
+        return [item_id for item_id, _ in self._pools.get(tag, ())]
+
+    def restore_fills(self, tag):
+        """Reset the fill of a tag's items to the colors from the current scene."""
+        for item_id, item in self._pools.get(tag, ()):
+            self.canvas.itemconfig(item_id, fill=item.fill)
 
     def draw_tree(self, params):
         """Draw the Christmas tree based on provided parameters."""
         try:
             logger.debug("Drawing tree", extra={'metadata': params})
 
-            # Extract parameters for the tree
-            height = params['height']
-            width = params['width']
-            layers = params['layers']
-            color = params['color']
-            ornaments = params.get('ornaments', 5)
-
-            # Center the tree on the canvas
-            canvas_width = self.canvas.winfo_width()
-            canvas_height = self.canvas.winfo_height()
-            start_x = canvas_width // 2
-            start_y = canvas_height - 100
-
-            # Calculate the height available for layers (excluding trunk)
-            usable_height = height - 50
-            layer_height = usable_height / layers
-
-            # Store layer triangles for decoration placement
-            layer_triangles = []
-
-            # Draw layers from bottom to top
-            for i in range(layers):
-                current_layer = layers - i - 1
-                layer_width = width * ((current_layer + 1) / layers)
-
-                y_bottom = start_y - (i * layer_height)
-                y_top = y_bottom - layer_height
-
-                x_left = start_x - (layer_width / 2)
-                x_right = start_x + (layer_width / 2)
-
-                points = [
-                    x_left, y_bottom,  # Bottom left
-                    x_right, y_bottom,  # Bottom right
-                    start_x, y_top  # Top center
-                ]
-
-                # Store triangle vertices for later use
-                layer_triangles.append({
-                    'vertices': [(x_left, y_bottom), (x_right, y_bottom), (start_x, y_top)],
-                    'width': layer_width,
-                    'y_bottom': y_bottom,
-                    'y_top': y_top,
-                    'center_x': start_x
-                })
-
-                # Create the triangle for this layer
-                self.canvas.create_polygon(
-                    points,
-                    fill=color,
-                    outline='#1f1f1f'
-                )
-
-            # Draw the trunk
-            trunk_width = width / 6
-            trunk_height = 50
-            self.canvas.create_rectangle(
-                start_x - trunk_width / 2,
-                start_y,
-                start_x + trunk_width / 2,
-                start_y + trunk_height,
-                fill='#8B4513',
-                outline='#1f1f1f'
-            )
-
-            # Add ornaments
-            attempts = 0
-            ornaments_placed = 0
-            max_attempts = ornaments * 10  # Limit attempts to avoid infinite loops
+            # Imported on first draw so NumPy stays out of startup
+            from tree_scene import build_tree_scene
 
-            while ornaments_placed < ornaments and attempts < max_attempts:
-                attempts += 1
-
-                # Select random layer
-                layer = random.choice(layer_triangles)
-
-                # Generate random position
-                x_offset = random.uniform(-0.8, 0.8) * (layer['width'] / 2)
-                y_offset = random.uniform(0.2, 0.8) * (layer['y_bottom'] - layer['y_top'])
-
-                ornament_x = layer['center_x'] + x_offset
-                ornament_y = layer['y_bottom'] - y_offset
-
-                # Check if the ornament is inside the triangle
-                vertices = layer['vertices']
-                if self.is_point_in_triangle(
-                        ornament_x, ornament_y,
-                        vertices[0][0], vertices[0][1],  # Left point
-                        vertices[1][0], vertices[1][1],  # Right point
-                        vertices[2][0], vertices[2][1]  # Top point
-                ):
-                    self.draw_ornament(ornament_x, ornament_y)
-                    ornaments_placed += 1
+            params = normalize_params(params)
+            scene = get_render_cache().get_scene(
+                params, self.canvas.winfo_width(), self.canvas.winfo_height(), build_tree_scene
+            )
+            self.render_scene(scene)
 
             logger.debug("Tree drawn successfully with decorations")
 
@@ -174,4 +210,4 @@ class TreeDrawer:
                     }
                 },
                 exc_info=True
-            )
\ No newline at end of file
+            )
@@ -0,0 +1,305 @@
+"""
+Headless tree scene model.
+
+A scene is a flat, ordered list of drawing primitives in canvas coordinates.
+Building one needs nothing but the tree parameters, so trees can be computed
+in worker processes, cached and benchmarked without a display server.
+TreeDrawer only replays a finished scene onto the Tk canvas.
+"""
+import hashlib
+import json
+
+import numpy as np
+
+from logger import NiceLogger
+from ornament_placement import place_ornaments, LAYOUT_RANDOM
+from settings import CANVAS_WIDTH, CANVAS_HEIGHT, CANVAS_BACKGROUND
+
+# Initialize logger
+logger = NiceLogger(__name__).get_logger()
+
+ORNAMENT_COLORS = (
+    '#FF0000', '#FFD700', '#00FF00', '#FF69B4', '#00FFFF',
+    '#FF4500', '#9400D3', '#FF1493', '#00FF7F', '#FF8C00'
+)
+GARLAND_COLORS = ('#FFD700', '#C0C0C0', '#FF0000')
+OUTLINE_COLOR = '#1f1f1f'
+TRUNK_COLOR = '#8B4513'
+CAP_COLOR = '#C0C0C0'
+
+TRUNK_HEIGHT = 50
+ORNAMENT_SIZE = 8
+ORNAMENT_CAP_HEIGHT = 2
+GARLAND_WIDTH = 2
+GARLAND_POINTS = 25  # Points per garland polyline
+GARLAND_SAG = 0.6  # Sag relative to the vertical spacing between garlands
+
+
+class Primitive:
+    """Base drawing primitive: a flat coordinate tuple plus styling."""
+    __slots__ = ('coords', 'fill', 'outline', 'tag')
+    kind = None
+
+    def __init__(self, coords, fill, outline=OUTLINE_COLOR, tag=None):
+        self.coords = tuple(coords)
+        self.fill = fill
+        self.outline = outline
+        self.tag = tag
+
+    def style(self):
+        """Canvas item options for this primitive."""
+        return {'fill': self.fill, 'outline': self.outline}
+
+    def __eq__(self, other):
+        return (
+                type(self) is type(other)
+                and self.coords == other.coords
+                and self.tag == other.tag
+                and self.style() == other.style()
+        )
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.coords!r}, fill={self.fill!r}, tag={self.tag!r})"
+
+
+class Polygon(Primitive):
+    """Closed polygon given as x1, y1, x2, y2, ..."""
+    __slots__ = ()
+    kind = 'polygon'
+
+
+class Rect(Primitive):
+    """Axis-aligned rectangle given as x1, y1, x2, y2."""
+    __slots__ = ()
+    kind = 'rect'
+
+
+class Oval(Primitive):
+    """Ellipse inscribed in the bounding box x1, y1, x2, y2."""
+    __slots__ = ()
+    kind = 'oval'
+
+
+class Line(Primitive):
+    """Open polyline given as x1, y1, x2, y2, ...; drawn in the fill color."""
+    __slots__ = ('width',)
+    kind = 'line'
+
+    def __init__(self, coords, fill, width=1, tag=None):
+        super().__init__(coords, fill, outline=None, tag=tag)
+        self.width = width
+
+    def style(self):
+        return {'fill': self.fill, 'width': self.width}
+
+
+class TreeScene:
+    """Ordered collection of primitives together with the viewport they were laid out for."""
+    __slots__ = ('width', 'height', 'background', 'items', 'params')
+
+    def __init__(self, width, height, background=CANVAS_BACKGROUND, params=None):
+        self.width = width
+        self.height = height
+        self.background = background
+        self.items = []
+        # Parameters the scene was built from, if any
+        self.params = params
+
+    def add(self, item):
+        self.items.append(item)
+        return item
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+PRIMITIVE_TYPES = {cls.kind: cls for cls in (Polygon, Rect, Oval, Line)}
+
+
+def scene_to_json(scene):
+    """Plain JSON encoding of a scene, for caching; the inverse of scene_from_json."""
+    items = []
+    for item in scene:
+        entry = {'type': item.kind, 'tag': item.tag, 'coords': [float(c) for c in item.coords], 'fill': item.fill}
+        if isinstance(item, Line):
+            entry['width'] = item.width
+        else:
+            entry['outline'] = item.outline
+        items.append(entry)
+    return json.dumps({
+        'width': scene.width, 'height': scene.height, 'background': scene.background,
+        'params': scene.params, 'items': items
+    }, default=str).encode('utf-8')
+
+
+def scene_from_json(data):
+    """Rebuild a scene encoded by scene_to_json; raises ValueError, KeyError or TypeError on bad data."""
+    document = json.loads(data)
+    scene = TreeScene(document['width'], document['height'], document['background'], document['params'])
+    for entry in document['items']:
+        cls = PRIMITIVE_TYPES[entry['type']]
+        if cls is Line:
+            scene.add(Line(entry['coords'], entry['fill'], entry['width'], entry['tag']))
+        else:
+            scene.add(cls(entry['coords'], entry['fill'], entry['outline'], entry['tag']))
+    return scene
+
+
+def scene_digest(scene):
+    """SHA-256 of what a scene draws, regardless of the parameters it was built from."""
+    content = TreeScene(scene.width, scene.height, scene.background)
+    content.items = scene.items
+    return hashlib.sha256(scene_to_json(content)).hexdigest()
+
+
+def make_rng(seed=None):
+    """Create the per-render random generator; the same seed always yields the same tree."""
+    return np.random.default_rng(seed)
+
+
+def get_random_color(rng=None):
+    """Pick a random bright color for decorations."""
+    if rng is None:
+        rng = make_rng()
+    return ORNAMENT_COLORS[int(rng.integers(len(ORNAMENT_COLORS)))]
+
+
+def compute_layer_triangles(params, canvas_width, canvas_height):
+    """Compute layer triangles from bottom to top, plus the tree base point."""
+    height = params['height']
+    width = params['width']
+    layers = params['layers']
+
+    # Center the tree on the canvas
+    start_x = canvas_width // 2
+    start_y = canvas_height - 100
+
+    # Calculate the height available for layers (excluding trunk)
+    usable_height = height - TRUNK_HEIGHT
+    layer_height = usable_height / layers
+
+    layer_triangles = []
+    for i in range(layers):
+        current_layer = layers - i - 1
+        layer_width = width * ((current_layer + 1) / layers)
+
+        y_bottom = start_y - (i * layer_height)
+        y_top = y_bottom - layer_height
+
+        x_left = start_x - (layer_width / 2)
+        x_right = start_x + (layer_width / 2)
+
+        layer_triangles.append({
+            'vertices': [(x_left, y_bottom), (x_right, y_bottom), (start_x, y_top)],
+            'width': layer_width,
+            'y_bottom': y_bottom,
+            'y_top': y_top,
+            'center_x': start_x
+        })
+
+    return layer_triangles, start_x, start_y
+
+
+def add_ornament(scene, x, y, color, size=ORNAMENT_SIZE):
+    """Add a bauble and its cap to the scene."""
+    scene.add(Oval((x - size, y - size, x + size, y + size), color, tag='ornament'))
+    scene.add(Rect((x - size / 3, y - size - ORNAMENT_CAP_HEIGHT, x + size / 3, y - size), CAP_COLOR, tag='cap'))
+
+
+def cycle_ornament_colors(scene, step):
+    """Copy of the scene with every ornament moved `step` places along the color palette."""
+    # Not the tree its parameters describe anymore
+    cycled = TreeScene(scene.width, scene.height, scene.background)
+    count = len(ORNAMENT_COLORS)
+    for item in scene:
+        if item.tag == 'ornament' and item.fill in ORNAMENT_COLORS:
+            fill = ORNAMENT_COLORS[(ORNAMENT_COLORS.index(item.fill) + step) % count]
+            item = Oval(item.coords, fill, item.outline, item.tag)
+        cycled.add(item)
+    return cycled
+
+
+def garland_polylines(layer_triangles, chains):
+    """Sagging garland curves across the layers, one flat point list per garland.
+
+    Garlands are spread over the layers starting from the bottom. Each one
+    hangs between the two slanted edges of its layer and is clipped to the
+    layer outline.
+    """
+    polylines = []
+    layers = len(layer_triangles)
+    if chains <= 0 or layers == 0:
+        return polylines
+
+    s = np.linspace(-1.0, 1.0, GARLAND_POINTS)
+    for index, layer in enumerate(layer_triangles):
+        count = chains // layers + (1 if index < chains % layers else 0)
+        layer_height = layer['y_bottom'] - layer['y_top']
+        spacing = layer_height / (count + 1)
+
+        for k in range(count):
+            y_anchor = layer['y_top'] + spacing * (k + 1)
+            half_width = layer['width'] / 2 * (y_anchor - layer['y_top']) / layer_height
+            xs = layer['center_x'] + s * half_width
+            ys = y_anchor + GARLAND_SAG * spacing * (1.0 - s * s)
+
+            # Below the anchor the layer only gets wider, so clipping reduces to the base line
+            ys = np.minimum(ys, layer['y_bottom'])
+            polylines.append(np.column_stack((xs, ys)).ravel().tolist())
+
+    return polylines
+
+
+def build_tree_scene(params, canvas_width=CANVAS_WIDTH, canvas_height=CANVAS_HEIGHT, rng=None):
+    """Turn tree parameters into a scene, without touching Tk.
+
+    All randomness comes from one per-render generator, seeded from
+    params['seed'] unless an explicit `rng` is passed, so identical
+    parameters and seed give an identical scene.
+    """
+    logger.debug("Building tree scene", extra={'metadata': params})
+
+    color = params['color']
+    width = params['width']
+    ornaments = params.get('ornaments', 5)
+    chains = params.get('chains', 0)
+    layout = params.get('layout', LAYOUT_RANDOM)
+
+    if rng is None:
+        rng = make_rng(params.get('seed'))
+
+    scene = TreeScene(canvas_width, canvas_height, params=dict(params))
+    layer_triangles, start_x, start_y = compute_layer_triangles(params, canvas_width, canvas_height)
+
+    # Layers from bottom to top
+    for layer in layer_triangles:
+        points = [coord for vertex in layer['vertices'] for coord in vertex]
+        scene.add(Polygon(points, color, tag='layer'))
+
+    # Trunk
+    trunk_width = width / 6
+    scene.add(Rect(
+        (start_x - trunk_width / 2, start_y, start_x + trunk_width / 2, start_y + TRUNK_HEIGHT),
+        TRUNK_COLOR,
+        tag='trunk'
+    ))
+
+    # Garlands, each a single polyline
+    for index, points in enumerate(garland_polylines(layer_triangles, chains)):
+        scene.add(Line(points, GARLAND_COLORS[index % len(GARLAND_COLORS)], width=GARLAND_WIDTH, tag='garland'))
+
+    # Ornaments, sampled and colored in one batch
+    positions = place_ornaments(
+        layer_triangles, ornaments, rng,
+        layout=layout,
+        radius=ORNAMENT_SIZE + ORNAMENT_CAP_HEIGHT
+    )
+    color_indices = rng.integers(len(ORNAMENT_COLORS), size=len(positions))
+    for (x, y), color_index in zip(positions.tolist(), color_indices.tolist()):
+        add_ornament(scene, x, y, ORNAMENT_COLORS[color_index])
+
+    logger.debug("Tree scene built", extra={'metadata': {'items': len(scene)}})
+    return scene
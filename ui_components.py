@@ -8,8 +8,12 @@ from settings import (
     MIN_WIDTH, MAX_WIDTH,
     MIN_LAYERS, MAX_LAYERS,
     MIN_ORNAMENTS, MAX_ORNAMENTS,
+    MIN_CHAINS, MAX_CHAINS,
     DEFAULT_COLOR,
-    DEFAULT_ORNAMENTS
+    DEFAULT_ORNAMENTS,
+    DEFAULT_CHAINS,
+    LIVE_PREVIEW_INTERVAL_MS,
+    LAYOUT_RANDOM, LAYOUT_EVEN
 )
 from translations import TRANSLATIONS
 
@@ -35,8 +39,18 @@ class UIComponents:
         self.layers_var = tk.IntVar(value=5)
         self.color_var = tk.StringVar(value=DEFAULT_COLOR)
         self.ornaments_var = tk.IntVar(value=DEFAULT_ORNAMENTS)
+        self.chains_var = tk.IntVar(value=DEFAULT_CHAINS)
+        self.even_spacing_var = tk.BooleanVar(value=False)
+        self.live_preview_var = tk.BooleanVar(value=False)
+        self.twinkle_var = tk.BooleanVar(value=False)
+        self.snowfall_var = tk.BooleanVar(value=False)
+        self.seed_var = tk.StringVar(value='')  # Empty means a new random tree every draw
+
+        # Pending coalesced live-preview redraw
+        self._redraw_job = None
 
         self._create_controls()
+        self._watch_parameters()
         logger.debug("UI components initialized successfully")
 
     def update_language(self, new_lang):
@@ -56,6 +70,18 @@ class UIComponents:
             self.draw_button.config(
                 text=TRANSLATIONS[self.current_lang]['draw_tree']
             )
+            self.even_spacing_check.config(
+                text=TRANSLATIONS[self.current_lang]['even_spacing']
+            )
+            self.live_preview_check.config(
+                text=TRANSLATIONS[self.current_lang]['live_preview']
+            )
+            self.twinkle_check.config(
+                text=TRANSLATIONS[self.current_lang]['twinkle']
+            )
+            self.snowfall_check.config(
+                text=TRANSLATIONS[self.current_lang]['snowfall']
+            )
 
             logger.debug("Language update completed successfully")
 
@@ -92,6 +118,36 @@ class UIComponents:
                 exc_info=True
             )
 
+    def _watch_parameters(self):
+        """Redraw on every parameter change while live preview is on."""
+        for var in (self.height_var, self.width_var, self.layers_var, self.color_var,
+                    self.ornaments_var, self.chains_var, self.even_spacing_var, self.seed_var):
+            var.trace_add('write', self._on_parameter_change)
+        self.live_preview_var.trace_add('write', self._on_parameter_change)
+
+    def _on_parameter_change(self, *args):
+        """Coalesce a burst of variable writes into at most one redraw per frame."""
+        if not self.live_preview_var.get() or self._redraw_job is not None:
+            return
+        self._redraw_job = self.frame.after(LIVE_PREVIEW_INTERVAL_MS, self._live_redraw)
+
+    def _live_redraw(self):
+        """Run the pending redraw; the callback reads the parameters as they are now."""
+        self._redraw_job = None
+        if self.live_preview_var.get():
+            self.draw_callback()
+
+    def _get_seed(self):
+        """Parse the optional seed field; anything that isn't an integer means no seed."""
+        text = self.seed_var.get().strip()
+        if not text:
+            return None
+        try:
+            return abs(int(text))
+        except ValueError:
+            logger.warning("Ignoring invalid seed", extra={'metadata': {'seed': text}})
+            return None
+
     def get_parameters(self):
         """Get current tree parameters."""
         try:
@@ -100,7 +156,10 @@ class UIComponents:
                 'width': self.width_var.get(),
                 'layers': self.layers_var.get(),
                 'color': self.color_var.get() or DEFAULT_COLOR,
-                'ornaments': self.ornaments_var.get()
+                'ornaments': self.ornaments_var.get(),
+                'chains': self.chains_var.get(),
+                'layout': LAYOUT_EVEN if self.even_spacing_var.get() else LAYOUT_RANDOM,
+                'seed': self._get_seed()
             }
             logger.debug("Retrieved parameters", extra={'metadata': params})
             return params
@@ -117,7 +176,10 @@ class UIComponents:
                 'width': 200,
                 'layers': 5,
                 'color': DEFAULT_COLOR,
-                'ornaments': DEFAULT_ORNAMENTS
+                'ornaments': DEFAULT_ORNAMENTS,
+                'chains': DEFAULT_CHAINS,
+                'layout': LAYOUT_RANDOM,
+                'seed': None
             }
 
     def _create_controls(self):
@@ -206,6 +268,67 @@ class UIComponents:
             )
             ornaments_scale.grid(row=4, column=1, padx=5, pady=5, sticky='ew')
 
+            # Chains control
+            self.labels['chains'] = ttk.Label(
+                self.frame,
+                text=TRANSLATIONS[self.current_lang]['chains']
+            )
+            self.labels['chains'].grid(row=5, column=0, padx=5, pady=5, sticky='w')
+
+            chains_scale = ttk.Scale(
+                self.frame,
+                from_=MIN_CHAINS,
+                to=MAX_CHAINS,
+                variable=self.chains_var,
+                orient="horizontal"
+            )
+            chains_scale.grid(row=5, column=1, padx=5, pady=5, sticky='ew')
+
+            # Ornament layout control
+            self.even_spacing_check = ttk.Checkbutton(
+                self.frame,
+                text=TRANSLATIONS[self.current_lang]['even_spacing'],
+                variable=self.even_spacing_var
+            )
+            self.even_spacing_check.grid(row=6, column=1, padx=5, pady=5, sticky='w')
+
+            # Live preview control
+            self.live_preview_check = ttk.Checkbutton(
+                self.frame,
+                text=TRANSLATIONS[self.current_lang]['live_preview'],
+                variable=self.live_preview_var
+            )
+            self.live_preview_check.grid(row=7, column=1, padx=5, pady=5, sticky='w')
+
+            # Twinkling lights control
+            self.twinkle_check = ttk.Checkbutton(
+                self.frame,
+                text=TRANSLATIONS[self.current_lang]['twinkle'],
+                variable=self.twinkle_var
+            )
+            self.twinkle_check.grid(row=8, column=1, padx=5, pady=5, sticky='w')
+
+            # Snowfall control
+            self.snowfall_check = ttk.Checkbutton(
+                self.frame,
+                text=TRANSLATIONS[self.current_lang]['snowfall'],
+                variable=self.snowfall_var
+            )
+            self.snowfall_check.grid(row=9, column=1, padx=5, pady=5, sticky='w')
+
+            # Seed control
+            self.labels['seed'] = ttk.Label(
+                self.frame,
+                text=TRANSLATIONS[self.current_lang]['seed']
+            )
+            self.labels['seed'].grid(row=10, column=0, padx=5, pady=5, sticky='w')
+
+            seed_entry = ttk.Entry(
+                self.frame,
+                textvariable=self.seed_var
+            )
+            seed_entry.grid(row=10, column=1, padx=5, pady=5, sticky='ew')
+
             # Draw button
             self.draw_button = ttk.Button(
                 self.frame,
@@ -213,7 +336,7 @@ class UIComponents:
                 command=self.draw_callback,
                 style='Accent.TButton'
             )
-            self.draw_button.grid(row=5, column=0, columnspan=2, pady=20)
+            self.draw_button.grid(row=11, column=0, columnspan=2, pady=20)
 
             # Configure grid column weights for proper scaling
             self.frame.grid_columnconfigure(1, weight=1)
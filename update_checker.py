@@ -1,30 +1,107 @@
+import os
 import subprocess
-import tempfile
+import sys
+import time
+from pathlib import Path
 
 import requests
 from packaging import version
 
+from delta import DeltaError, apply_delta, delta_name
+from artifact_cache import get_artifact_cache
+from downloader import (
+    RETRYABLE_ERRORS, ChecksumMismatch, DownloadCancelled, download_file, get_session, sha256_file
+)
 from logger import NiceLogger
-from settings import PROJECT_VERSION, GITHUB_REPO
+from release_cache import get_release_cache
+from settings import (
+    PROJECT_VERSION, GITHUB_REPO, UPDATE_CONNECT_TIMEOUT, UPDATE_READ_TIMEOUT, UPDATES_DIR, DOWNLOAD_RETRIES
+)
 
 # Initialize logger
 logger = NiceLogger(__name__).get_logger()
 
+# Every request gets both a connect and a read timeout
+REQUEST_TIMEOUT = (UPDATE_CONNECT_TIMEOUT, UPDATE_READ_TIMEOUT)
 
-def download_update(download_url):
-    """Download update installer from GitHub."""
+CHECKSUM_SUFFIX = '.sha256'
+
+
+class UpdateCancelled(Exception):
+    """Raised when an update check or download is cancelled, e.g. because the app is closing."""
+
+
+def _check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise UpdateCancelled()
+
+
+def published_sha256(release, asset):
+    """SHA-256 published for a release asset, or None.
+
+    Taken from the asset's `digest` field ("sha256:<hex>") when the API
+    provides one, otherwise from a `<asset name>.sha256` file attached to
+    the release (the format written by sha256sum).
+    """
+    digest = asset.get('digest') or ''
+    if digest.startswith('sha256:'):
+        return digest[len('sha256:'):]
+
+    checksum_asset = next(
+        (a for a in release['assets'] if a['name'] == asset['name'] + CHECKSUM_SUFFIX),
+        None
+    )
+    if checksum_asset is None:
+        return None
+
+    # A checksum that can't be fetched leaves the installer unverified rather than skipping the update
+    attempt = 0
+    while True:
+        try:
+            response = get_session().get(checksum_asset['browser_download_url'], timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            return response.text.split()[0]
+        except RETRYABLE_ERRORS as e:
+            if attempt < DOWNLOAD_RETRIES:
+                time.sleep(min(2 ** attempt, 8))
+                attempt += 1
+                continue
+            error = e
+        except (requests.RequestException, IndexError) as e:
+            error = e
+
+        logger.warning("Failed to fetch published checksum, installer can't be verified", extra={
+            'metadata': {'asset': checksum_asset['name'], 'error': str(error)}
+        })
+        return None
+
+
+def download_update(download_url, cancel_event=None, expected_sha256=None, progress=None, destination=None):
+    """Download update installer from GitHub to destination, by default into UPDATES_DIR.
+
+    An interrupted download (including a cancelled one) resumes where it
+    stopped the next time. With expected_sha256 the file is verified while
+    it streams and rejected on mismatch. progress(done, total) is called
+    from the downloading thread.
+    """
+    destination = destination or UPDATES_DIR / download_url.rsplit('/', 1)[-1]
     try:
-        logger.info("Downloading update", extra={'metadata': {'url': download_url}})
-        response = requests.get(download_url, stream=True)
-        response.raise_for_status()
-
-        # Create temp directory for the download
-        with tempfile.NamedTemporaryFile(suffix='.exe', delete=False) as temp_file:
-            logger.debug(f"Saving installer to: {temp_file.name}")
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    temp_file.write(chunk)
-            return temp_file.name
+        logger.info("Downloading update", extra={'metadata': {'url': download_url, 'path': str(destination)}})
+        return str(download_file(
+            download_url, destination,
+            expected_sha256=expected_sha256,
+            cancel_event=cancel_event,
+            progress=progress,
+            timeout=REQUEST_TIMEOUT
+        ))
+    except DownloadCancelled:
+        logger.info("Update download cancelled, partial download kept", extra={'metadata': {'url': download_url}})
+        return None
+    except ChecksumMismatch as e:
+        logger.error("Downloaded installer failed verification", extra={
+            'metadata': {'url': download_url, 'error': str(e)}
+        })
+        return None
     except Exception as e:
         logger.error(
             "Failed to download update",
@@ -34,6 +111,90 @@ def download_update(download_url):
         return None
 
 
+def installed_executable():
+    """The running application's executable when frozen by PyInstaller, else None."""
+    if getattr(sys, 'frozen', False):
+        return Path(sys.executable)
+    return None
+
+
+def update_from_delta(release, delta_asset, source_path, installer_asset, expected_sha256, artifact_cache,
+                      cancel_event=None, progress=None):
+    """Rebuild the new installer from source_path and the release's delta; None when that isn't possible.
+
+    The rebuilt installer is verified against the delta's recorded hash and
+    the installer's published checksum, so a failure here only costs the
+    delta download before falling back to the full installer.
+    """
+    delta_path = download_update(
+        delta_asset['browser_download_url'], cancel_event,
+        expected_sha256=published_sha256(release, delta_asset),
+        progress=progress,
+        destination=artifact_cache.staging_path(delta_asset['name'])
+    )
+    if delta_path is None:
+        return None
+
+    installer_path = artifact_cache.staging_path(installer_asset['name'])
+    try:
+        apply_delta(source_path, Path(delta_path), installer_path, expected_sha256)
+        logger.info("Installer rebuilt from delta", extra={'metadata': {
+            'delta_size': delta_asset.get('size'), 'installer_size': installer_asset.get('size')
+        }})
+        return str(installer_path)
+    except (DeltaError, OSError) as e:
+        logger.warning("Failed to apply update delta, downloading full installer", extra={
+            'metadata': {'delta': delta_asset['name'], 'error': str(e)}
+        })
+        return None
+    finally:
+        os.remove(delta_path)
+
+
+def fetch_installer(release, latest_version, installer_asset, artifact_cache, delta_source=None,
+                    cancel_event=None, progress=None):
+    """Download (or rebuild from a delta) and verify the installer, then add it to artifact_cache.
+
+    Returns the cached installer path, or None.
+    """
+    expected_sha256 = published_sha256(release, installer_asset)
+    if expected_sha256 is None:
+        logger.warning("No checksum available for installer, it can't be verified", extra={
+            'metadata': {'asset': installer_asset['name']}
+        })
+    _check_cancelled(cancel_event)
+
+    # Prefer the delta from this version, when we have the file it applies to
+    installer_path = None
+    delta_asset = next(
+        (asset for asset in release['assets'] if asset['name'] == delta_name(PROJECT_VERSION, latest_version)),
+        None
+    )
+    delta_source = delta_source or installed_executable()
+    if delta_asset and delta_source:
+        installer_path = update_from_delta(
+            release, delta_asset, delta_source, installer_asset, expected_sha256, artifact_cache,
+            cancel_event, progress
+        )
+        _check_cancelled(cancel_event)
+
+    # Download the full installer
+    if installer_path is None:
+        installer_path = download_update(
+            installer_asset['browser_download_url'], cancel_event,
+            expected_sha256=expected_sha256,
+            progress=progress,
+            destination=artifact_cache.staging_path(installer_asset['name'])
+        )
+    if installer_path is None:
+        return None
+
+    logger.info("Update downloaded successfully")
+    # Hashed during the download when a checksum was published; only hash again without one
+    installer_sha256 = expected_sha256 or sha256_file(installer_path).hexdigest()
+    return artifact_cache.add(latest_version, installer_asset['name'], Path(installer_path), installer_sha256)
+
+
 def install_update(installer_path):
     """Install the update silently."""
     try:
@@ -61,8 +222,19 @@ def install_update(installer_path):
         return False
 
 
-def check_for_updates():
-    """Check for new versions and prepare silent update if available."""
+def check_for_updates(api_url=None, cancel_event=None, release_cache=None, progress=None, delta_source=None,
+                      artifact_cache=None):
+    """Check for new versions and prepare silent update if available.
+
+    api_url overrides the GitHub releases endpoint, e.g. to point at a local release server,
+    and release_cache the on-disk cache of the latest release.
+    An installer already downloaded and verified for the latest version is taken from
+    artifact_cache without any network traffic.
+    Setting cancel_event abandons the check at the next step and returns None.
+    progress(done, total) reports the installer download.
+    When the release has a delta from this version, the installer is rebuilt from delta_source
+    (by default the installed executable) and the delta instead of downloading it in full.
+    """
     try:
         logger.info("Checking for updates...", extra={
             'metadata': {
@@ -71,26 +243,28 @@ def check_for_updates():
             }
         })
 
-        # Extract owner and repo from GitHub URL
-        _, _, _, owner, repo = GITHUB_REPO.rstrip('/').split('/')
-        api_url = f"https://api.github.com/repos/{owner}/{repo}/releases"
-
-        # Get releases from GitHub
-        logger.debug(f"Fetching releases from {api_url}")
-        response = requests.get(api_url)
-        response.raise_for_status()
+        if api_url is None:
+            # Extract owner and repo from GitHub URL
+            _, _, _, owner, repo = GITHUB_REPO.rstrip('/').split('/')
+            api_url = f"https://api.github.com/repos/{owner}/{repo}/releases"
 
-        releases = response.json()
-        logger.debug(f'Found {len(releases)} releases')
-        stable_releases = [r for r in releases if not r['prerelease']]
+        # Latest stable release, throttled and conditional; falls back to the cached answer when offline
+        if release_cache is None:
+            release_cache = get_release_cache()
+        latest_release = release_cache.latest_release(api_url, timeout=REQUEST_TIMEOUT, session=get_session())
+        _check_cancelled(cancel_event)
 
-        if not stable_releases:
+        if latest_release is None:
             logger.warning("No stable releases found")
             return None
 
-        latest_release = stable_releases[0]
         latest_version = latest_release['tag_name'].lstrip('v')
 
+        # Installers of any other version are of no use anymore
+        if artifact_cache is None:
+            artifact_cache = get_artifact_cache()
+        artifact_cache.prune(keep_version=latest_version)
+
         # Compare versions
         logger.debug(f"Comparing versions: current={PROJECT_VERSION}, latest={latest_version}")
 
@@ -105,12 +279,16 @@ def check_for_updates():
             )
 
             if installer_asset:
-                # Download the installer
-                installer_path = download_update(installer_asset['browser_download_url'])
+                # An installer downloaded on an earlier launch costs no network at all
+                installer_path = artifact_cache.lookup(latest_version, installer_asset['name'])
+                if installer_path is None:
+                    installer_path = fetch_installer(
+                        latest_release, latest_version, installer_asset, artifact_cache, delta_source,
+                        cancel_event, progress
+                    )
                 if installer_path:
-                    logger.info("Update downloaded successfully")
                     return {
-                        'installer_path': installer_path,
+                        'installer_path': str(installer_path),
                         'version': latest_version,
                         'release_url': latest_release['html_url']
                     }
@@ -123,6 +301,10 @@ def check_for_updates():
 
         return None
 
+    except UpdateCancelled:
+        logger.info("Update check cancelled")
+        return None
+
     except Exception as e:
         logger.error(
             "Failed to check for updates",
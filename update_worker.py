@@ -0,0 +1,76 @@
+"""
+Background update check.
+
+The update check and installer download run on a daemon thread so the
+window never waits for the network. Results are handed back through a
+queue that the Tk thread drains from an `after` callback; Tk itself is only
+ever touched from the Tk thread. Cancelling (on close) stops the worker at
+its next step and drops whatever it would have reported.
+"""
+import queue
+import threading
+
+from logger import NiceLogger
+
+# Initialize logger
+logger = NiceLogger(__name__).get_logger()
+
+# Message kinds put on the results queue, as (kind, payload) pairs
+RESULT = 'result'
+PROGRESS = 'progress'  # Installer download progress, payload (done_bytes, total_bytes or None)
+
+
+class UpdateWorker:
+    """Runs check_for_updates on a daemon thread and reports back through a queue."""
+
+    def __init__(self, api_url=None):
+        self.api_url = api_url
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='update-check', daemon=True)
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def start(self):
+        logger.debug("Starting background update check")
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """Ask the worker to stop; it finishes its current network call, bounded by the request timeouts."""
+        if not self.cancel_event.is_set():
+            logger.info("Cancelling background update check")
+            self.cancel_event.set()
+
+    def _run(self):
+        try:
+            # Imported here so the Tk thread never pays for requests/packaging
+            from update_checker import check_for_updates
+            result = check_for_updates(
+                api_url=self.api_url, cancel_event=self.cancel_event, progress=self._report_progress
+            )
+        except Exception as e:
+            logger.error("Background update check failed", extra={'metadata': {'error': str(e)}}, exc_info=True)
+            result = None
+
+        if not self.cancelled:
+            self.messages.put((RESULT, result))
+
+    def _report_progress(self, done, total):
+        if not self.cancelled:
+            self.messages.put((PROGRESS, (done, total)))
+
+    def poll(self):
+        """All messages received so far, without blocking."""
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
@@ -0,0 +1,129 @@
+"""
+View transform and level of detail for zoomed and panned scenes.
+
+A scene stays in its own coordinates; the view maps it to the canvas with a
+uniform scale and offset. The level of detail is picked from the on-screen
+size of each primitive, and anything outside the viewport is culled, so the
+number of canvas items stays roughly the same at any zoom:
+
+- ornaments keep their caps only while large enough to show them, shrink
+  to single-pixel dots, and are dropped once smaller than a pixel;
+- layers collapse into one silhouette triangle when they are only a few
+  pixels tall;
+- garlands lose points shorter than a few pixels and vanish when thinner
+  than half a pixel.
+"""
+import math
+
+from settings import (
+    LOD_DROP_RADIUS, LOD_DOT_RADIUS, LOD_CAP_RADIUS, LOD_LAYER_MIN_HEIGHT, LOD_MIN_SEGMENT, LOD_MIN_LINE_WIDTH
+)
+
+
+class ViewTransform:
+    """Uniform zoom plus pan offset from scene to canvas coordinates."""
+    __slots__ = ('scale', 'offset_x', 'offset_y')
+
+    def __init__(self, scale=1.0, offset_x=0.0, offset_y=0.0):
+        self.scale = scale
+        self.offset_x = offset_x
+        self.offset_y = offset_y
+
+    @property
+    def is_identity(self):
+        return self.scale == 1.0 and self.offset_x == 0.0 and self.offset_y == 0.0
+
+    def apply(self, coords):
+        scale, offset_x, offset_y = self.scale, self.offset_x, self.offset_y
+        return [
+            value * scale + (offset_x if index % 2 == 0 else offset_y)
+            for index, value in enumerate(coords)
+        ]
+
+    def zoom_at(self, factor, x, y):
+        """Zoom by factor keeping the canvas point (x, y) fixed."""
+        self.offset_x = x - (x - self.offset_x) * factor
+        self.offset_y = y - (y - self.offset_y) * factor
+        self.scale *= factor
+
+    def pan(self, dx, dy):
+        self.offset_x += dx
+        self.offset_y += dy
+
+    def reset(self):
+        self.scale, self.offset_x, self.offset_y = 1.0, 0.0, 0.0
+
+
+def _outside(coords, width, height, margin):
+    xs = coords[0::2]
+    ys = coords[1::2]
+    return max(xs) < -margin or min(xs) > width + margin or max(ys) < -margin or min(ys) > height + margin
+
+
+def _decimate(coords, min_segment):
+    """Drop polyline points closer than min_segment to the previous kept point; endpoints stay."""
+    points = list(zip(coords[0::2], coords[1::2]))
+    kept = [points[0]]
+    for point in points[1:-1]:
+        if math.dist(point, kept[-1]) >= min_segment:
+            kept.append(point)
+    kept.append(points[-1])
+    return [coord for point in kept for coord in point]
+
+
+def view_scene(scene, transform, view_width, view_height):
+    """Scene as seen through the transform in a view_width x view_height viewport.
+
+    Returns the scene itself when the transform is the identity.
+    """
+    if transform.is_identity:
+        return scene
+
+    # Imported on first zoom; tree_scene pulls in NumPy
+    from tree_scene import ORNAMENT_SIZE, Line, Polygon, Rect, TreeScene
+
+    scale = transform.scale
+    view = TreeScene(view_width, view_height, scene.background)
+    radius = ORNAMENT_SIZE * scale
+
+    layers = [item for item in scene if item.tag == 'layer']
+    simplify_layers = bool(layers) and all(
+        (max(item.coords[1::2]) - min(item.coords[1::2])) * scale < LOD_LAYER_MIN_HEIGHT for item in layers
+    )
+    silhouette_added = False
+
+    for item in scene:
+        if item.tag == 'layer' and simplify_layers:
+            if silhouette_added:
+                continue
+            # Bottom corners of the lowest layer and the apex of the highest one
+            item = Polygon(layers[0].coords[:4] + layers[-1].coords[4:6], item.fill, item.outline, item.tag)
+            silhouette_added = True
+
+        elif item.tag == 'cap' and radius < LOD_CAP_RADIUS:
+            continue
+
+        elif item.tag == 'ornament' and radius < LOD_DOT_RADIUS:
+            if radius < LOD_DROP_RADIUS:
+                continue
+            x1, y1, x2, y2 = transform.apply(item.coords)
+            x, y = round((x1 + x2) / 2), round((y1 + y2) / 2)
+            if _outside((x, y), view_width, view_height, 1):
+                continue
+            view.add(Rect((x, y, x + 1, y + 1), item.fill, outline='', tag=item.tag))
+            continue
+
+        coords = transform.apply(item.coords)
+
+        if item.kind == 'line':
+            width = item.width * scale
+            if width < LOD_MIN_LINE_WIDTH or _outside(coords, view_width, view_height, width):
+                continue
+            view.add(Line(_decimate(coords, LOD_MIN_SEGMENT), item.fill, width=max(1, round(width)), tag=item.tag))
+            continue
+
+        if _outside(coords, view_width, view_height, 1):
+            continue
+        view.add(type(item)(coords, item.fill, item.outline, item.tag))
+
+    return view